@@ -0,0 +1,45 @@
+import pygame
+
+class AssetCache:
+    """
+    Fonts, images and their scaled or rotated variants, each loaded or
+    transformed once per key and then shared.
+
+    Use the module level `ASSETS` so `Game`, `Map` and `Maze` all read from
+    the same cache. Fonts need `pygame.font` to be initialised.
+    """
+    def __init__(self) -> None:
+        self.fonts: dict[tuple[str, int], pygame.font.Font] = {}
+        self.images: dict[tuple[str, tuple[int, int], int], pygame.Surface] = {}
+
+    def font(self, path: str, size: int) -> pygame.font.Font:
+        """Font from `path` (`None` for pygame's default font) at `size`."""
+        key: tuple[str, int] = (path, size)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.Font(path, size)
+        return self.fonts[key]
+
+    def image(self, path: str, size: tuple[int, int] = None, rotation: int = 0) -> pygame.Surface:
+        """Image from `path`, rotated by `rotation` degrees and then scaled to `size`."""
+        key: tuple[str, tuple[int, int], int] = (path, size, rotation % 360)
+        if key in self.images:
+            return self.images[key]
+
+        if size is None and key[2] == 0:
+            image: pygame.Surface = pygame.image.load(path)
+            if pygame.display.get_surface():
+                image = image.convert_alpha()
+        else:
+            image = self.image(path)
+            if key[2]:
+                image = pygame.transform.rotate(image, key[2])
+            if size:
+                image = pygame.transform.scale(image, size)
+        self.images[key] = image
+        return image
+
+    def clear(self) -> None:
+        self.fonts.clear()
+        self.images.clear()
+
+ASSETS: AssetCache = AssetCache()
@@ -0,0 +1,82 @@
+import time
+from collections import deque
+from gridElements import Grid, Node
+from pathSearchers import BFS, AStar, BidirectionalBFS, DIRECTIONS
+from snake import Snake, SnakeBodyBlock, Apple
+
+class NodeBFS(BFS):
+    """Reference search allocating one linked `Node` per reached block."""
+    def create_path(self, snake: Snake, targets: list[any]):
+        self.start_search(snake, targets)
+
+        width: int = self.bounds[0]
+        open_flat: bytearray = self.index.open_flat
+        passable_flat: bytearray = self.index.passable_flat
+        occupancy: list[int] = self.occupancy
+
+        start_node = Node((snake.body[0].x, snake.body[0].y))
+        queue = deque([start_node])
+        visited: set[tuple[int, int]] = {start_node.position}
+
+        farthest_node = start_node
+        max_depth = 0
+
+        while queue:
+            current_node: Node = queue.popleft()
+            self.expanded_nodes += 1
+            if current_node.depth > max_depth:
+                farthest_node = current_node
+                max_depth = current_node.depth
+
+            if current_node.position in self.target_values:
+                self.path = self.trace_nodes(current_node)
+                return
+
+            x, y = current_node.position
+            open_directions: int = open_flat[y * width + x]
+            for bit, dx, dy in DIRECTIONS:
+                if not open_directions & bit:
+                    continue
+                neighbor_position = (x + dx, y + dy)
+                if (
+                    neighbor_position not in visited and
+                    not occupancy[(y + dy) * width + x + dx] and
+                    passable_flat[(y + dy) * width + x + dx]
+                ):
+                    queue.append(Node(neighbor_position, current_node, depth=current_node.depth + 1))
+                    visited.add(neighbor_position)
+
+        self.longest_path = self.trace_nodes(farthest_node)
+
+    def trace_nodes(self, node: Node) -> list[tuple[int, int]]:
+        path: list[tuple[int, int]] = []
+        while node is not None:
+            path.append(node.position)
+            node = node.parent
+        path.reverse()
+        return path
+
+def benchmark(searcher: BFS, snake: Snake, targets: list[any], repeats: int) -> tuple[float, int, int]:
+    start: float = time.perf_counter()
+    for _ in range(repeats):
+        searcher.create_path(snake, targets)
+    elapsed: float = (time.perf_counter() - start) / repeats
+    return elapsed, searcher.expanded_nodes, len(searcher.path or searcher.longest_path)
+
+if __name__ == "__main__":
+    size: int = 500
+    repeats: int = 5
+    # No walls or traits, the most blocks any search can reach
+    grid: Grid = Grid(size, size)
+    snake: Snake = Snake("./res/config.json", (1, 1), map_size=(size, size))
+    snake.add_tail(SnakeBodyBlock((1, 2)))
+    cases: dict[str, list[Apple]] = {
+        "far apple": [Apple((size - 2, size - 2))],
+        "no apple": []
+    }
+
+    for case, targets in cases.items():
+        print(f"{size}x{size} open map, {case}:")
+        for searcher in (NodeBFS(grid), BFS(grid), AStar(grid), BidirectionalBFS(grid)):
+            elapsed, expanded, length = benchmark(searcher, snake, targets, repeats)
+            print(f"  {type(searcher).__name__:<17} {elapsed * 1000:9.1f} ms  {expanded:8} expanded  path {length}")
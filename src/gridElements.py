@@ -1,63 +1,108 @@
-class Cell:
-    def __init__(self, x: int, y: int):
-        self.walls: dict[str, bool] = {
-            "right": True,
-            "left": True,
-            "top": True,
-            "down": True
-        }
-        self.x: int
-        self.y: int
-        self.x, self.y = x, y
-        self.visited: bool = False
-        
-    def get_neighbors(self, maze: list[list['Cell']]) -> list['Cell']:
-        neighbors: list['Cell'] = []
-
-        if self.x > 0 and not maze[self.y][self.x - 1].visited:
-            neighbors.append(maze[self.y][self.x - 1])
-        if self.x < len(maze[self.y]) - 1 and not maze[self.y][self.x + 1].visited:
-            neighbors.append(maze[self.y][self.x + 1])
-        if self.y > 0 and not maze[self.y - 1][self.x].visited:
-            neighbors.append(maze[self.y - 1][self.x])
-        if self.y < len(maze) - 1 and not maze[self.y + 1][self.x].visited:
-            neighbors.append(maze[self.y + 1][self.x])
-
-        return neighbors
-    
-    def to_string(self) -> str:
-        return f"(x: {self.x}, y: {self.y}, {self.walls})"
-    
+from collections.abc import Iterator, MutableMapping
+import numpy as np
+
+WALL_BITS: dict[str, int] = {
+    "right": 1,
+    "left": 2,
+    "top": 4,
+    "down": 8
+}
+TRAIT_BITS: dict[str, int] = {
+    "forest": 1,
+    "lava": 2,
+    "river": 4
+}
+
+class BitFlags(MutableMapping):
+    """Dict-like view over the bits of one cell in a grid array."""
+    __slots__ = ("array", "x", "y", "bits")
+
+    def __init__(self, array: np.ndarray, x: int, y: int, bits: dict[str, int]):
+        self.array: np.ndarray = array
+        self.x: int = x
+        self.y: int = y
+        self.bits: dict[str, int] = bits
+
+    def __getitem__(self, key: str) -> bool:
+        return bool(self.array[self.y, self.x] & self.bits[key])
+
+    def __setitem__(self, key: str, value: bool) -> None:
+        if value:
+            self.array[self.y, self.x] |= self.bits[key]
+        else:
+            self.array[self.y, self.x] &= ~self.bits[key] & 0xFF
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("Grid flags can not be removed")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.bits)
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+def flags_to_mask(flags: dict[str, bool], bits: dict[str, int]) -> int:
+    mask: int = 0
+    for key, value in flags.items():
+        if value:
+            mask |= bits[key]
+    return mask
+
+def mask_to_names(mask: int, bits: dict[str, int]) -> list[str]:
+    return [key for key, bit in bits.items() if mask & bit] or None
+
 class Block:
-    def __init__(self, x: int, y: int):
-        self.walls: dict[str, bool] = {
-            "right": False,
-            "left": False,
-            "top": False,
-            "down": False
-        }
-        self.trait: dict[str, bool] = {
-            "forest": False,
-            "lava": False,
-            "river": False,
-        }
+    """Lightweight view of one map block stored inside a `Grid`."""
+    __slots__ = ("grid", "x", "y")
+
+    def __init__(self, grid: 'Grid', x: int, y: int):
+        self.grid: Grid = grid
         self.x: int = x
         self.y: int = y
-        self.height: float = 0
+
+    @property
+    def walls(self) -> BitFlags:
+        return BitFlags(self.grid.walls, self.x, self.y, WALL_BITS)
+
+    @walls.setter
+    def walls(self, walls: dict[str, bool]) -> None:
+        self.grid.walls[self.y, self.x] = flags_to_mask(walls, WALL_BITS)
+
+    @property
+    def trait(self) -> BitFlags:
+        return BitFlags(self.grid.traits, self.x, self.y, TRAIT_BITS)
+
+    @trait.setter
+    def trait(self, trait: dict[str, bool]) -> None:
+        self.grid.traits[self.y, self.x] = flags_to_mask(trait, TRAIT_BITS)
+
+    @property
+    def height(self) -> float:
+        return float(self.grid.heights[self.y, self.x])
+
+    @height.setter
+    def height(self, height: float) -> None:
+        self.grid.heights[self.y, self.x] = height
+
+    @property
+    def wall_mask(self) -> int:
+        return int(self.grid.walls[self.y, self.x])
+
+    @property
+    def trait_mask(self) -> int:
+        return int(self.grid.traits[self.y, self.x])
 
     def reset_walls(self) -> None:
-        self.walls = {
-            "right": False,
-            "left": False,
-            "top": False,
-            "down": False
-        }   
-         
+        self.grid.walls[self.y, self.x] = 0
+
     def get_traits(self) -> list[str]:
-        return [key for key, value in self.trait.items() if value] or None
-    
+        return mask_to_names(self.trait_mask, TRAIT_BITS)
+
     def get_walls(self) -> list[str]:
-        return [key for key, value in self.walls.items() if value] or None
+        return mask_to_names(self.wall_mask, WALL_BITS)
 
     def __str__(self) -> str:
         return f"({self.x}, {self.y})"
@@ -73,6 +118,65 @@ class Block:
     def __hash__(self) -> int:
         return hash((self.x, self.y))
 
+class GridRow:
+    """One row of a `Grid`, indexable like `list[Block]`."""
+    __slots__ = ("grid", "y")
+
+    def __init__(self, grid: 'Grid', y: int):
+        self.grid: Grid = grid
+        self.y: int = y
+
+    def __getitem__(self, x: int | slice) -> Block | list[Block]:
+        if isinstance(x, slice):
+            return [Block(self.grid, bx, self.y) for bx in range(*x.indices(self.grid.width))]
+        if x < 0:
+            x += self.grid.width
+        if not 0 <= x < self.grid.width:
+            raise IndexError("grid row index out of range")
+        return Block(self.grid, x, self.y)
+
+    def __len__(self) -> int:
+        return self.grid.width
+
+    def __iter__(self) -> Iterator[Block]:
+        for x in range(self.grid.width):
+            yield Block(self.grid, x, self.y)
+
+class Grid:
+    """
+    Array backed map storage.
+
+    Walls and traits are kept as bitmasks (see `WALL_BITS` and `TRAIT_BITS`)
+    and heights as float32, each in one contiguous (height, width) array.
+    Indexing with `grid[y][x]` returns a `Block` view so the grid can be used
+    wherever a `list[list[Block]]` was expected.
+    """
+    def __init__(self, width: int, height: int):
+        self.width: int = width
+        self.height: int = height
+        self.walls: np.ndarray = np.zeros((height, width), dtype=np.uint8)
+        self.traits: np.ndarray = np.zeros((height, width), dtype=np.uint8)
+        self.heights: np.ndarray = np.zeros((height, width), dtype=np.float32)
+
+    def block(self, x: int, y: int) -> Block:
+        return Block(self, x, y)
+
+    def __getitem__(self, y: int | slice) -> GridRow | list[GridRow]:
+        if isinstance(y, slice):
+            return [GridRow(self, row) for row in range(*y.indices(self.height))]
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("grid index out of range")
+        return GridRow(self, y)
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __iter__(self) -> Iterator[GridRow]:
+        for y in range(self.height):
+            yield GridRow(self, y)
+
 class Node:
     def __init__(self, position: tuple[int, int], parent=None, depth=0):
         self.position = position
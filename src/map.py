@@ -1,21 +1,93 @@
+import os
 import random
-import math
 import json
+import hashlib
+import heapq
+import numpy as np
 import pygame
-from itertools import cycle
-from heapq import nlargest
-from noise import snoise2
-from gridElements import Block
-from maze import Maze
+from collections.abc import Iterator
+from itertools import cycle, islice
+from gridElements import Block, Grid, WALL_BITS, TRAIT_BITS
+from maze import Maze, block_walls
+from simplexNoise import snoise2
+from tileAtlas import TileAtlas
+from profiler import PROFILER
+
+# World file: header, then heights (float32), random generator state
+# (uint32), walls, traits, forest/lava territory bits (uint8 per block)
+# and maze cell walls (uint8 per cell), all little-endian and row-major.
+WORLD_MAGIC: bytes = b"SMAP"
+WORLD_VERSION: int = 2
+WORLD_EXTENSION: str = ".world"
+# Raised whenever a seed generates a different world, so worlds cached by
+# an older generator are never loaded in place of a fresh one
+GENERATOR_VERSION: int = 4
+WORLD_HEADER: np.dtype = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("generator", "<u4"),
+    ("width", "<u4"),
+    ("height", "<u4"),
+    ("maze_width", "<u4"),
+    ("maze_height", "<u4")
+])
+RNG_STATE_SIZE: int = 625
+
+# Lava lakes start more than this Manhattan distance from other lakes and grow to one less
+LAKE_SPACING: int = 5
+
+def circles_collide(c1: dict, c2: dict) -> bool:
+    """Whether two circles overlap or lie less than one block apart."""
+    dx: int = c1["position"][0] - c2["position"][0]
+    dy: int = c1["position"][1] - c2["position"][1]
+    gap: int = c1["radius"] + c2["radius"] + 1
+    return dx * dx + dy * dy <= gap * gap
+
+class CircleGrid:
+    """
+    Placed location circles in a uniform grid of buckets.
+
+    Buckets are wider than two of the largest circles, so a collision test
+    only compares against circles in the 3x3 buckets around the new one
+    instead of every circle placed so far.
+    """
+    def __init__(self, max_radius: int):
+        self.max_radius: int = max_radius
+        self.bucket_size: int = 2 * max_radius + 2
+        self.buckets: dict[tuple[int, int], list[dict]] = {}
+
+    def add(self, circle: dict) -> None:
+        x, y = circle["position"]
+        self.buckets.setdefault((x // self.bucket_size, y // self.bucket_size), []).append(circle)
+
+    def collides(self, circle: dict) -> bool:
+        """Whether `circle` collides with a placed circle of another location."""
+        x, y = circle["position"]
+        reach: int = circle["radius"] + self.max_radius + 1
+        size: int = self.bucket_size
+        for by in range((y - reach) // size, (y + reach) // size + 1):
+            for bx in range((x - reach) // size, (x + reach) // size + 1):
+                for other in self.buckets.get((bx, by), ()):
+                    if other["location"] != circle["location"] and circles_collide(other, circle):
+                        return True
+        return False
 
 class Map:
-    def __init__(self, path: str, algorithm_visualisation: bool = False):        
+    def __init__(self, path: str, algorithm_visualisation: bool = False, rng: random.Random = None, generate: bool = True,
+                 size: tuple[int, int] = None):        
         with open(path, "r") as file:
             data: dict = json.load(file)
 
+        # One generator drives every random choice, `seed` in the config makes worlds reproducible
+        self.rng: random.Random = rng if rng else random.Random(data.get("seed"))
+
+        # `size` (in maze cells) overrides the config
+        config_size: tuple[int, int] = (data["maze_width_in_cells"], data["maze_height_in_cells"])
+        self.size: tuple[int, int] = size if size else config_size
+
         self.blocks_in_cell: int = data["blocks_in_cell"]
-        self.map_width: int = data["maze_width_in_cells"] * self.blocks_in_cell
-        self.map_height: int = data["maze_height_in_cells"] * self.blocks_in_cell
+        self.map_width: int = self.size[0] * self.blocks_in_cell
+        self.map_height: int = self.size[1] * self.blocks_in_cell
         self.block_size: int = data["block_size_px"]
 
         self.screen_width: int = data["screen_width_px"]
@@ -25,6 +97,11 @@ class Map:
 
         self.locations: dict = data.get("locations", {})
         self.rivers: dict = data.get("rivers_data", {})
+        if self.size != config_size:
+            # Keep the configured density of locations and rivers
+            area_ratio: float = (self.size[0] * self.size[1]) / (config_size[0] * config_size[1])
+            self.locations = {name: dict(location, count=round(location["count"] * area_ratio)) for name, location in self.locations.items()}
+            self.rivers = dict(self.rivers, count=round(self.rivers["count"] * area_ratio))
 
         self.block_width: int = self.screen_width // self.map_width
         self.block_height: int = self.screen_height // self.map_height
@@ -32,7 +109,8 @@ class Map:
         self.noise_params: dict = data.get("noise_params", {})
 
         self.algorithm_visualisation: bool = algorithm_visualisation
-        self.canvas: pygame.Surface = pygame.Surface((self.screen_width, self.screen_height))
+        self.canvas: pygame.Surface = pygame.Surface((self.screen_width, self.screen_height)) if algorithm_visualisation else None
+        self.atlas: TileAtlas = None
 
         self.screen: pygame.Surface = None
 
@@ -40,34 +118,140 @@ class Map:
             self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
             pygame.display.set_caption("Map creation algorithm visualisation")
 
-        self.maze: Maze = Maze("./res/config.json", False, self.screen)
+        self.maze: Maze = Maze(path, False, self.screen, self.rng, generate, self.size)
 
         self.location_circles: list[dict] = []
-        self.map: list[list[Block]] = [[Block(x, y) for x in range(self.map_width)] for y in range(self.map_height)]
-        self.lava_territory: set[Block] = set()
-        self.forest_territory: set[Block] = set()
+        self.grid: Grid = Grid(self.map_width, self.map_height)
+        self.map: Grid = self.grid
+        # Forest and lava territory as `TRAIT_BITS` per block
+        self.territories: np.ndarray = np.zeros((self.map_height, self.map_width), dtype=np.uint8)
         
-        self.generate_map()
+        if generate:
+            self.generate_map()
+
+    @staticmethod
+    def cache_key(data: dict, seed: int) -> str:
+        config: str = json.dumps(data, sort_keys=True)
+        return hashlib.sha256(f"{config}|{seed}|{GENERATOR_VERSION}".encode()).hexdigest()[:20]
+
+    @classmethod
+    def cached(cls, path: str, cache_dir: str, seed: int, rng: random.Random = None) -> 'Map':
+        """
+        World for this config and seed, loaded from `cache_dir` when it was
+        generated before, otherwise generated and saved there.
+        """
+        with open(path, "r") as file:
+            data: dict = json.load(file)
+        rng = rng if rng else random.Random(seed)
+
+        world_path: str = os.path.join(cache_dir, cls.cache_key(data, seed) + WORLD_EXTENSION)
+        if os.path.exists(world_path):
+            return cls.load(path, world_path, rng)
+
+        world: Map = cls(path, rng=rng)
+        os.makedirs(cache_dir, exist_ok=True)
+        world.save(world_path)
+        return world
+
+    def save(self, world_path: str) -> None:
+        """
+        Write the map, territories, maze and the generator state to `world_path`.
+
+        The generator state is stored as it is now, so saving straight after
+        generation lets a loaded world continue with the same random stream.
+        """
+        header: np.ndarray = np.zeros(1, dtype=WORLD_HEADER)
+        header[0] = (WORLD_MAGIC, WORLD_VERSION, GENERATOR_VERSION, self.map_width, self.map_height, self.maze.maze_width, self.maze.maze_height)
+
+        rng_state: np.ndarray = np.array(self.rng.getstate()[1], dtype="<u4")
+
+        sections: list[np.ndarray] = [
+            header,
+            self.grid.heights.astype("<f4"),
+            rng_state,
+            self.grid.walls,
+            self.grid.traits,
+            self.territories,
+            self.maze.walls
+        ]
+        # Written next to the target and renamed so readers never see half a file
+        temporary_path: str = f"{world_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            for section in sections:
+                file.write(np.ascontiguousarray(section).tobytes())
+        os.replace(temporary_path, world_path)
+
+    @classmethod
+    def load(cls, path: str, world_path: str, rng: random.Random = None) -> 'Map':
+        """
+        Map for config `path` with its content read from a saved world.
+
+        Arrays are memory-mapped copy-on-write, so loading costs no parsing
+        and later edits (like the exit) never touch the file.
+        """
+        header: np.ndarray = np.fromfile(world_path, dtype=WORLD_HEADER, count=1)
+        if len(header) == 0 or header["magic"][0] != WORLD_MAGIC or header["version"][0] != WORLD_VERSION:
+            raise ValueError(f"{world_path} is not a version {WORLD_VERSION} world file")
+        if header["generator"][0] != GENERATOR_VERSION:
+            raise ValueError(f"{world_path} was generated by world generator {header['generator'][0]}, not {GENERATOR_VERSION}")
+
+        world: Map = cls(path, rng=rng, generate=False)
+        width: int = int(header["width"][0])
+        height: int = int(header["height"][0])
+        maze_width: int = int(header["maze_width"][0])
+        maze_height: int = int(header["maze_height"][0])
+        if (width, height, maze_width, maze_height) != (world.map_width, world.map_height, world.maze.maze_width, world.maze.maze_height):
+            raise ValueError(f"{world_path} does not match the sizes in {path}")
+
+        layout: list[tuple[str, str, tuple[int, ...]]] = [
+            ("heights", "<f4", (height, width)),
+            ("rng_state", "<u4", (RNG_STATE_SIZE,)),
+            ("walls", "u1", (height, width)),
+            ("traits", "u1", (height, width)),
+            ("territories", "u1", (height, width)),
+            ("maze_walls", "u1", (maze_height, maze_width))
+        ]
+        sections: dict[str, np.ndarray] = {}
+        offset: int = WORLD_HEADER.itemsize
+        for name, dtype, shape in layout:
+            sections[name] = np.memmap(world_path, dtype=dtype, mode="c", offset=offset, shape=shape)
+            offset += sections[name].nbytes
+
+        world.grid.heights = sections["heights"]
+        world.grid.walls = sections["walls"]
+        world.grid.traits = sections["traits"]
+        world.rng.setstate((3, tuple(sections["rng_state"].tolist()), None))
+        world.territories = sections["territories"]
+
+        world.maze.walls = sections["maze_walls"]
+        return world
 
     def generate_map(self) -> None:
-        self.generate_circles()
+        with PROFILER.span("map.circles"):
+            self.generate_circles()
         
         forest_circles: list[dict] = [circle for circle in self.location_circles if circle["location"] == "forest"]
-        self.generate_forests(forest_circles)
+        with PROFILER.span("map.forests"):
+            self.generate_forests(forest_circles)
         lava_circles: list[dict] = [circle for circle in self.location_circles if circle["location"] == "lava"]
-        self.generate_lava(lava_circles)
+        with PROFILER.span("map.lava"):
+            self.generate_lava(lava_circles)
         
-        self.generate_hightmap()
-        self.generate_rivers()
+        with PROFILER.span("map.heightmap"):
+            self.generate_hightmap()
+        with PROFILER.span("map.rivers"):
+            self.generate_rivers()
 
         self.location_circles = []
-        self.implement_maze()
+        with PROFILER.span("map.implement_maze"):
+            self.implement_maze()
 
     def generate_circles(self) -> None:
         attempts_given: int = 100
 
         location_names: list[str] = list(self.locations.keys())
         location_counts: dict[str, int] = {loc: self.locations[loc]["count"] for loc in location_names}
+        placed: CircleGrid = CircleGrid(max((location["max_radius_in_blocks"] for location in self.locations.values()), default=0))
 
         location_cycle = cycle(location_names)
 
@@ -77,11 +261,11 @@ class Map:
             if location_counts[location_name] == 0:
                 continue
 
+            location_data: dict = self.locations[location_name]
             for _ in range(attempts_given):
-                location_data: dict = self.locations[location_name]
-                r: int = random.randint(location_data["min_radius_in_blocks"], location_data["max_radius_in_blocks"])
-                x: int = random.randint(r, self.map_width - r)
-                y: int = random.randint(r, self.map_height - r)
+                r: int = self.rng.randint(location_data["min_radius_in_blocks"], location_data["max_radius_in_blocks"])
+                x: int = self.rng.randint(r, self.map_width - r)
+                y: int = self.rng.randint(r, self.map_height - r)
 
                 new_circle: dict = {
                     "location": location_name,
@@ -89,56 +273,56 @@ class Map:
                     "radius": r,
                 }
 
-                collide: bool = False
-                for circle in self.location_circles:
-                    if circle["location"] != new_circle["location"]:
-                        if self.circles_collide(circle, new_circle):
-                            collide = True
-                            break
-
-                if not collide:
+                if not placed.collides(new_circle):
+                    placed.add(new_circle)
                     self.location_circles.append(new_circle)
                     location_counts[location_name] -= 1
                     if self.algorithm_visualisation:
                         self.visualise(1)
                     break
-
-    def circles_collide(self, c1: dict, c2: dict) -> bool:
-        distance: float = math.sqrt((c1["position"][0] - c2["position"][0])**2 
-                            + (c1["position"][1] - c2["position"][1])**2)
-        
-        return c1["radius"] + c2["radius"] + 1 >= distance
         
+    def fill_circles(self, circles: list[dict], bit: int) -> None:
+        """
+        Set `bit` in `territories` on every block inside `circles`.
+
+        Each circle is one broadcast distance mask over its bounding box. The
+        last row and column of the map are left out, as they always were.
+        """
+        for circle in circles:
+            cx, cy = circle["position"]
+            r: int = circle["radius"]
+            left: int = max(0, cx - r)
+            top: int = max(0, cy - r)
+            xs: np.ndarray = np.arange(left, min(self.map_width - 1, cx + r + 1)) - cx
+            ys: np.ndarray = np.arange(top, min(self.map_height - 1, cy + r + 1)) - cy
+            inside: np.ndarray = xs[np.newaxis, :] ** 2 + ys[:, np.newaxis] ** 2 <= r * r
+            self.territories[top:top + len(ys), left:left + len(xs)][inside] |= bit
+
     def generate_forests(self, forest_circles: list[dict]) -> None:
-        for forest in forest_circles:
-            cx, cy = forest["position"]
-            r: int = forest["radius"]
-
-            for x in range(max(0, cx - r), min(self.map_width - 1, cx + r + 1)):
-                for y in range(max(0, cy - r), min(self.map_width - 1, cy + r + 1)):
-                    if (x - cx) ** 2 + (y - cy) ** 2 <= r ** 2:
-                        self.forest_territory.add(self.map[y][x])
+        self.fill_circles(forest_circles, TRAIT_BITS["forest"])
         self.generate_trees()
 
     def generate_trees(self) -> None:
         used_blocks_coord: set[tuple[int, int]] = set()
         fill_pct: float = self.locations["forest"]["fill_pct"]
+        territory: list[int] = np.flatnonzero(self.territories & TRAIT_BITS["forest"]).tolist()
 
         trees_placed_algorithmicly: float = fill_pct * (3 / 4)
-        while len(used_blocks_coord) < len(self.forest_territory) * trees_placed_algorithmicly:
-            block: Block = random.choice(list(self.forest_territory))
+        while len(used_blocks_coord) < len(territory) * trees_placed_algorithmicly:
+            y, x = divmod(self.rng.choice(territory), self.map_width)
+            block: Block = self.grid.block(x, y)
             if (block.x, block.y) in used_blocks_coord:
                 continue
 
             near_trees: list[Block] = self.get_near_trees(block)
             
-            tree: Block = random.choice(near_trees)
+            tree: Block = self.rng.choice(near_trees)
             if self.tree_near(tree, used_blocks_coord):
                 continue
             tree.trait["forest"] = True
             used_blocks_coord.add((tree.x, tree.y))
 
-            tree = random.choice(near_trees)
+            tree = self.rng.choice(near_trees)
             if self.tree_near(tree, used_blocks_coord):
                 continue
             tree.trait["forest"] = True
@@ -147,8 +331,9 @@ class Map:
             if self.algorithm_visualisation:
                 self.visualise(1) 
 
-        while len(used_blocks_coord) < len(self.forest_territory) * fill_pct:
-            block: Block = random.choice(list(self.forest_territory))
+        while len(used_blocks_coord) < len(territory) * fill_pct:
+            y, x = divmod(self.rng.choice(territory), self.map_width)
+            block: Block = self.grid.block(x, y)
             block.trait["forest"] = True
             used_blocks_coord.add((block.x, block.y))
             if self.algorithm_visualisation:
@@ -180,244 +365,293 @@ class Map:
         return near_trees
 
     def get_tree_by_coord(self, x: int, y: int) -> Block:
-        for tree in self.forest_territory:
-            if x == tree.x and y == tree.y:
-                return tree
-        return None
+        # Forest territory block at (x, y), `None` outside the map or the territory
+        if not (0 <= x < self.map_width and 0 <= y < self.map_height):
+            return None
+        return self.grid.block(x, y) if self.territories[y, x] & TRAIT_BITS["forest"] else None
     
     def generate_lava(self, lava_circle: list[dict]) -> None:
-        for lava in lava_circle:
-            cx, cy = lava["position"]
-            r: int = lava["radius"]
-
-            for x in range(max(0, cx - r), min(self.map_width - 1, cx + r + 1)):
-                for y in range(max(0, cy - r), min(self.map_width - 1, cy + r + 1)):
-                    if (x - cx) ** 2 + (y - cy) ** 2 <= r ** 2:
-                        self.lava_territory.add(self.map[y][x])
+        self.fill_circles(lava_circle, TRAIT_BITS["lava"])
         self.create_lava_lakes()
 
     def create_lava_lakes(self) -> None:
-        used_blocks: set[tuple[int, int]] = set()
-        lakes: list[set[Block]] = []
-        lava_fill_pct: float = self.locations["lava"]["fill_pct"]
-
-        while len(used_blocks) < len(self.lava_territory) * lava_fill_pct:
-            lake_start: Block = random.choice(list(self.lava_territory))
-            if (lake_start.x, lake_start.y) in used_blocks or lake_start.get_traits() is not None:
-                continue
-            if self.other_lake_near(lake_start, lakes, 5):
+        """
+        Grow lava lakes inside the lava territory until `fill_pct` of it is used.
+
+        Starts are drawn without replacement from a flat index of the
+        territory. A lake grows from a frontier heap of neighbouring territory
+        blocks, nearest to its start first with some random jitter, up to
+        `max_lake_size`. A distance field around finished lakes keeps new
+        starts more than `LAKE_SPACING` blocks and growing lakes more than
+        `LAKE_SPACING - 1` blocks away from them. Lakes below `min_lake_size`
+        are dropped, their blocks still count as used.
+        """
+        width: int = self.map_width
+        height: int = self.map_height
+        lava_data: dict = self.locations["lava"]
+        territory: bytearray = self.lava_mask()
+        candidates: list[int] = np.flatnonzero(np.frombuffer(territory, dtype=np.uint8)).tolist()
+        target: float = len(candidates) * lava_data["fill_pct"]
+
+        used: bytearray = bytearray((self.grid.traits != 0).ravel().tobytes())
+        used_count: int = 0
+        # Manhattan distance to the nearest block of a finished lake, capped past the spacing
+        lake_distance: list[int] = [LAKE_SPACING + 1] * (width * height)
+        spacing: list[tuple[int, int, int]] = [
+            (dx, dy, abs(dx) + abs(dy))
+            for dy in range(-LAKE_SPACING, LAKE_SPACING + 1)
+            for dx in range(abs(dy) - LAKE_SPACING, LAKE_SPACING - abs(dy) + 1)
+        ]
+        directions: tuple[tuple[int, int], ...] = (
+            (-1, -1), (0, -1), (1, -1),
+            (-1,  0),          (1,  0),
+            (-1,  1), (0,  1), (1,  1)
+        )
+
+        while used_count < target and candidates:
+            index: int = self.rng.randrange(len(candidates))
+            start: int = candidates[index]
+            candidates[index] = candidates[-1]
+            candidates.pop()
+            if used[start] or lake_distance[start] <= LAKE_SPACING:
                 continue
 
-            lava_lake_border: set[Block] = self.create_lava_lake_border(lake_start)
-            lake: set[Block] = set()
-
-            current_block: Block = random.choice(list(lava_lake_border))
-            lake.add(current_block) 
-            used_blocks.add((current_block.x, current_block.y))
-            lava_lake_border.remove(current_block)
-
-            while len(lake) < self.locations["lava"]["max_lake_size"]:
-                new_block: Block = self.get_one_nearest(current_block, lava_lake_border)
-                if new_block is None:
-                    break
-                if (new_block.x, new_block.y) in used_blocks:
-                    break
-                if self.other_lake_near(new_block, lakes, 4):
-                    break
-
-                lake.add(new_block)
-                used_blocks.add((new_block.x, new_block.y))
-                lava_lake_border.remove(new_block)
-                current_block = new_block
-
-            if len(lake) >= self.locations["lava"]["min_lake_size"]:
-                for lava in lake:
-                    lava.trait["lava"] = True  
-                    if self.algorithm_visualisation:
-                        self.visualise(1) 
-    
-    def other_lake_near(self, block: Block, lakes: list[set[Block]], min_dist: int) -> bool:
-        dist: float = float('inf')
-        for lake in lakes:
-            for l in lake:
-                new_dist: int = abs(block.x - l.x) + abs(block.y - l.y)
-                if new_dist < dist:
-                    dist = new_dist
-        return dist <= min_dist
-
-    def create_lava_lake_border(self, block: Block) -> set[Block]:
-        lake: set[Block] = set(self.get_lava_neighbors(block))
-        while len(lake) <= self.locations["lava"]["max_lake_size"] * 2:
-            lake = lake | set(self.get_lava_neighbors(random.choice(list(lake))))
-        lake.add(block)
-        return set(lake)
-
-    def get_lava_neighbors(self, block: Block) -> list[Block]:
-        directions: list[list[int]] = [
-            [-1, -1], [0, -1], [ 1, -1],
-            [-1,  0],          [ 1,  0],
-            [-1,  1], [0,  1], [ 1,  1],
-        ]
-        neighbors: list[Block] = []
-        for d in directions:
-            nblock: Block = self.get_lava_by_coord(block.x + d[0], block.y + d[1])
-            if nblock:
-                neighbors.append(nblock)
-        return neighbors
-
-    def get_lava_by_coord(self, x: int, y: int) -> Block:
-        for lava in self.lava_territory:
-            if x == lava.x and y == lava.y:
-                return lava
-        return None
-
-    def get_one_nearest(self, block: Block, blocks: set[Block]) -> Block:
-        nearest: list[Block] = []
-        dist: float = float('inf')
-        for b in blocks:
-            new_dist: int = abs(block.x - b.x) + abs(block.y - b.y)
-            if new_dist < dist:
-                dist = new_dist
-                nearest = [b]
-            elif new_dist == dist:
-                nearest.append(b)
-        return random.choice(nearest) if nearest else None
+            sx: int = start % width
+            sy: int = start // width
+            lake: list[int] = []
+            frontier: list[tuple[float, int]] = [(0.0, start)]
+            queued: set[int] = {start}
+            while frontier and len(lake) < lava_data["max_lake_size"]:
+                _, cell = heapq.heappop(frontier)
+                used[cell] = 1
+                used_count += 1
+                lake.append(cell)
+
+                x: int = cell % width
+                y: int = cell // width
+                for dx, dy in directions:
+                    nx: int = x + dx
+                    ny: int = y + dy
+                    if not (0 <= nx < width and 0 <= ny < height):
+                        continue
+                    neighbor: int = ny * width + nx
+                    if territory[neighbor] and not used[neighbor] and lake_distance[neighbor] >= LAKE_SPACING and neighbor not in queued:
+                        queued.add(neighbor)
+                        heapq.heappush(frontier, (abs(nx - sx) + abs(ny - sy) + 2 * self.rng.random(), neighbor))
+
+            if len(lake) < lava_data["min_lake_size"]:
+                continue
+            for cell in lake:
+                x, y = cell % width, cell // width
+                self.grid.block(x, y).trait["lava"] = True
+                if self.algorithm_visualisation:
+                    self.visualise(1)
+                for dx, dy, distance in spacing:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < width and 0 <= ny < height and distance < lake_distance[ny * width + nx]:
+                        lake_distance[ny * width + nx] = distance
     
     def generate_hightmap(self) -> None:
-        seed: int = random.randint(0, 123456)
-        for row in self.map:
-            for block in row:
-                noise_value: float = snoise2(
-                    block.x * self.noise_params["scale"],
-                    block.y * self.noise_params["scale"],
-                    octaves = self.noise_params["octaves"],
-                    persistence = self.noise_params["persistence"],
-                    lacunarity = self.noise_params["lacunarity"],
-                    base = seed
-                )
-                block.height = (noise_value + 1) / 2
-            
-            if self.algorithm_visualisation:
-                self.visualise(1)
+        seed: int = self.rng.randint(0, 123456)
+        scale: float = self.noise_params["scale"]
+        xs: np.ndarray = np.arange(self.map_width, dtype=np.float64) * scale
+        ys: np.ndarray = np.arange(self.map_height, dtype=np.float64) * scale
+        # Whole map in one broadcast call, same values as per-block noise.snoise2
+        self.grid.heights[:] = snoise2(
+            xs[np.newaxis, :],
+            ys[:, np.newaxis],
+            octaves = self.noise_params["octaves"],
+            persistence = self.noise_params["persistence"],
+            lacunarity = self.noise_params["lacunarity"],
+            base = seed
+        )
+        self.grid.heights += 1
+        self.grid.heights /= 2
+
+        if self.algorithm_visualisation:
+            self.visualise(1)
 
     def generate_rivers(self) -> None:
-        margi_x: int = len(self.map[0]) // 10
-        margi_y: int = len(self.map) // 10
-        all_blocks: list[Block] = [block for row in self.map[margi_y:-margi_y] for block in row[margi_x:-margi_x]]
-        top_blocks: list[Block] = self.select_river_starts(all_blocks, self.rivers["count"])
-
-        for start_block in top_blocks:
-            current: Block = start_block
-            river_path: list[Block] = []
-
-            while current:
+        """
+        Rivers run downhill from the highest blocks, always to the lowest
+        free neighbour, and stop at traits, lava territory or `max_length`.
+        Rivers shorter than `min_length` are removed again.
+
+        With `rivers_data.flow_threshold` set, every free block draining at
+        least that many blocks (see `flow_accumulation`) becomes river
+        instead, in one pass whatever the river count and length.
+        """
+        if self.rivers.get("flow_threshold"):
+            self.generate_flow_rivers(self.rivers["flow_threshold"])
+            return
+
+        width: int = self.map_width
+        river_bit: int = TRAIT_BITS["river"]
+        heights: list[float] = self.grid.heights.ravel().tolist()
+        traits: list[int] = self.grid.traits.ravel().tolist()
+        lava: bytearray = self.lava_mask()
+        # Blocks of the current river within Manhattan distance 2 of each block
+        near: list[int] = [0] * (width * self.map_height)
+        window: list[tuple[int, int]] = [(dx, dy) for dy in range(-2, 3) for dx in range(-2, 3) if abs(dx) + abs(dy) <= 2]
+
+        for start in self.select_river_starts(self.rivers["count"]):
+            current: int = start
+            river_path: list[int] = []
+
+            while current is not None:
                 if len(river_path) >= self.rivers["max_length"]:
                     break
-                if current.get_traits() is not None:
-                    break 
-                
-                if current in self.lava_territory:
+                if traits[current] or lava[current]:
                     break
 
-                current.trait["river"] = True
+                x: int = current % width
+                y: int = current // width
+                traits[current] |= river_bit
+                self.grid.traits[y, x] |= river_bit
                 river_path.append(current)
+                self.mark_near(near, x, y, window, 1)
 
                 if self.algorithm_visualisation:
                     self.visualise(1)
 
-                neighbors: list[Block] = self.get_valid_river_neighbors(current, river_path)
-                neighbors = [n for n in neighbors if n.get_traits() is None and n not in self.lava_territory]  
-                if not neighbors:
-                    break 
-
-                next_block: Block = min(neighbors, key=lambda b: b.height)
-
-                current = next_block
+                # Lowest free neighbour, first in left, right, up, down order on ties
+                current = None
+                for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                    if not (0 <= nx < width and 0 <= ny < self.map_height):
+                        continue
+                    neighbor: int = ny * width + nx
+                    if traits[neighbor] or lava[neighbor] or near[neighbor] >= 4:
+                        continue
+                    if current is None or heights[neighbor] < heights[current]:
+                        current = neighbor
+
+            for block in river_path:
+                self.mark_near(near, block % width, block // width, window, -1)
             if len(river_path) < self.rivers["min_length"]:
                 for block in river_path:
-                    block.trait["river"] = False
+                    traits[block] &= ~river_bit
+                    self.grid.traits[block // width, block % width] &= ~river_bit & 0xFF
                     if self.algorithm_visualisation:
                         self.visualise(1)
 
-    def select_river_starts(self, all_blocks: list[Block], num_rivers: int) -> list[Block]:
-        sorted_blocks: list[Block] = nlargest(len(all_blocks), all_blocks, key=lambda b: b.height)
-        selected_starts: list[Block] = []
+    def mark_near(self, near: list[int], x: int, y: int, window: list[tuple[int, int]], step: int) -> None:
+        for dx, dy in window:
+            if 0 <= x + dx < self.map_width and 0 <= y + dy < self.map_height:
+                near[(y + dy) * self.map_width + x + dx] += step
+
+    def lava_mask(self) -> bytearray:
+        """Flat `y * width + x` flags of the lava territory."""
+        return bytearray(((self.territories & TRAIT_BITS["lava"]) != 0).ravel().tobytes())
+
+    def select_river_starts(self, num_rivers: int) -> list[int]:
+        """
+        Highest blocks away from the map border, lava territory and each
+        other (`min_distance`), as flat `y * width + x` indices.
+        """
+        margin_x: int = self.map_width // 10
+        margin_y: int = self.map_height // 10
+        region: np.ndarray = self.grid.heights[margin_y:-margin_y, margin_x:-margin_x]
+        if region.size == 0 or num_rivers <= 0:
+            return []
+
+        region_width: int = region.shape[1]
+        min_distance: int = self.rivers["min_distance"]
+        bucket_size: int = max(1, min_distance)
+        buckets: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        lava: bytearray = self.lava_mask()
+        selected_starts: list[int] = []
+
+        # Highest first, ties in row-major order
+        for index in np.argsort(-region, axis=None, kind="stable").tolist():
+            x: int = margin_x + index % region_width
+            y: int = margin_y + index // region_width
+            if lava[y * self.map_width + x]:
+                continue
 
-        for block in sorted_blocks:
+            bx: int = x // bucket_size
+            by: int = y // bucket_size
+            too_close: bool = any(
+                abs(x - sx) + abs(y - sy) < min_distance
+                for ny in (by - 1, by, by + 1)
+                for nx in (bx - 1, bx, bx + 1)
+                for sx, sy in buckets.get((nx, ny), ())
+            )
+            if too_close:
+                continue
+
+            buckets.setdefault((bx, by), []).append((x, y))
+            selected_starts.append(y * self.map_width + x)
             if len(selected_starts) >= num_rivers:
                 break
-
-            too_close: bool = False
-            for selected in selected_starts:
-                distance: int = abs(block.x - selected.x) + abs(block.y - selected.y)
-                if distance < self.rivers["min_distance"]:
-                    too_close = True
-                    break
-
-            if not too_close and block not in self.lava_territory:
-                selected_starts.append(block)
-
         return selected_starts
-    
-    def get_valid_river_neighbors(self, current: Block, river_path: list[Block]) -> list[Block]:
-        neighbors: list[Block] = []
-        for neighbor in self.get_river_neighbors(current):
-            if neighbor.get_traits() is None and neighbor not in self.lava_territory:
-                check_distance: int = 2
-                counter: int = 0
-                for block in river_path:
-                    if abs(neighbor.x - block.x) + abs(neighbor.y - block.y) <= check_distance:
-                        counter += 1
-                if counter < 4:
-                    neighbors.append(neighbor)
-        return neighbors
 
-    def get_river_neighbors(self, block: Block) -> list[Block]:
-        directions: list[list[int]] = [
-            [-1, 0], [1, 0], [0, -1], [0, 1]
-        ]
-        neighbors: list[Block] = []
-        for d in directions:
-            nblock: Block = self.get_river_by_coord(block.x + d[0], block.y + d[1])
-            if nblock:
-                neighbors.append(nblock)
-        return neighbors
+    def flow_accumulation(self) -> np.ndarray:
+        """
+        Number of blocks draining through every block, itself included.
+
+        Water leaves a block towards its lowest neighbour (4-connected) when
+        that one is lower, so summing from the highest block down gives
+        the accumulation in one pass.
+        """
+        heights: np.ndarray = self.grid.heights
+        padded: np.ndarray = np.pad(heights, 1, constant_values=np.inf)
+        neighbours: np.ndarray = np.stack([padded[1:-1, :-2], padded[1:-1, 2:], padded[:-2, 1:-1], padded[2:, 1:-1]])
+        offsets: np.ndarray = np.array([-1, 1, -self.map_width, self.map_width])
+        indices: np.ndarray = np.arange(heights.size).reshape(heights.shape)
+        downstream: list[int] = np.where(
+            neighbours.min(axis=0) < heights, indices + offsets[neighbours.argmin(axis=0)], -1
+        ).ravel().tolist()
+
+        accumulation: list[int] = [1] * heights.size
+        for index in np.argsort(-heights, axis=None, kind="stable").tolist():
+            if downstream[index] >= 0:
+                accumulation[downstream[index]] += accumulation[index]
+        return np.array(accumulation).reshape(heights.shape)
+
+    def generate_flow_rivers(self, threshold: int) -> None:
+        lava: np.ndarray = np.frombuffer(self.lava_mask(), dtype=np.uint8).reshape(self.grid.traits.shape)
+        rivers: np.ndarray = (self.flow_accumulation() >= threshold) & (self.grid.traits == 0) & (lava == 0)
+        self.grid.traits[rivers] |= TRAIT_BITS["river"]
+        if self.algorithm_visualisation:
+            self.visualise(1)
+
+    def implement_maze(self, rows: Iterator[list[int]] = None) -> None:
+        """
+        Copy maze walls onto the blocks, one maze row at a time.
+
+        `rows` defaults to the generated maze, but any source of cell wall
+        rows works, like `Maze.stream_rows`. Only the first `size[1]` rows
+        are used, so an endless stream fills the map and stops. Walls are
+        left out of blocks with traits, except along the map border.
+
+        Walls are ORed in, so the map must not have walls yet: build it with
+        `generate=False` before stamping a maze of your own.
+        """
+        if self.grid.walls.any():
+            raise ValueError("Map already has maze walls, create it with generate=False to implement another maze")
+        if rows is None and not self.algorithm_visualisation:
+            # The whole maze is known, stamp it in one pass
+            self.stamp_walls(0, block_walls(self.maze.walls, self.blocks_in_cell))
+            return
+        for my, masks in enumerate(islice(rows if rows is not None else self.maze.rows(), self.size[1])):
+            self.implement_maze_row(my, masks)
+            if self.algorithm_visualisation:
+                self.visualise(1)
 
-    def get_river_by_coord(self, x: int, y: int) -> Block:
-        if x < 0 or x >= len(self.map[0]) or y < 0 or y >= len(self.map):
-            return None
-        return self.map[y][x]
-
-    def implement_maze(self) -> None:
-        maze_map: list[list[Block]] = self.maze.maze
-
-        for my in range(len(maze_map)):
-            for mx in range(len(maze_map[my])):
-                cell_walls: dict = maze_map[my][mx].walls
-                need_walls_top: bool = True if my == 0 else False
-                need_walls_down: bool = True if my == len(maze_map)-1 else False
-                
-                need_walls_left: bool = True if mx == 0 else False
-                need_walls_right: bool = True if mx == len(maze_map[my])-1 else False
-                
-                if cell_walls["top"]:
-                    for x in range(self.blocks_in_cell):
-                        if need_walls_top or self.map[my * self.blocks_in_cell][mx * self.blocks_in_cell + x].get_traits() is None:
-                            self.map[my * self.blocks_in_cell][mx * self.blocks_in_cell + x].walls["top"] = True
-                if cell_walls["down"]:
-                    for x in range(self.blocks_in_cell):
-                        if need_walls_down or self.map[(my + 1) * self.blocks_in_cell - 1][mx * self.blocks_in_cell + x].get_traits() is None:
-                            self.map[(my + 1) * self.blocks_in_cell - 1][mx * self.blocks_in_cell + x].walls["down"] = True
-                if cell_walls["right"]:
-                    for y in range(self.blocks_in_cell):
-                        if need_walls_right or self.map[my * self.blocks_in_cell + y][(mx + 1) * self.blocks_in_cell - 1].get_traits() is None:
-                            self.map[my * self.blocks_in_cell + y][(mx + 1) * self.blocks_in_cell - 1].walls["right"] = True
-                if cell_walls["left"]:
-                    for y in range(self.blocks_in_cell):
-                        if need_walls_left or self.map[my * self.blocks_in_cell + y][mx * self.blocks_in_cell].get_traits() is None:
-                            self.map[my * self.blocks_in_cell + y][mx * self.blocks_in_cell].walls["left"] = True
-                if self.algorithm_visualisation:
-                        self.visualise(1)
+    def implement_maze_row(self, my: int, masks: list[int]) -> None:
+        self.stamp_walls(my * self.blocks_in_cell, block_walls(masks, self.blocks_in_cell))
+
+    def stamp_walls(self, top: int, band: np.ndarray) -> None:
+        """OR block walls into the map from block row `top`, skipping blocks with traits except on the border."""
+        bottom: int = top + len(band)
+        keep: np.ndarray = np.where(self.grid.traits[top:bottom] == 0, np.uint8(0xFF), np.uint8(0))
+        if top == 0:
+            keep[0] |= WALL_BITS["top"]
+        if bottom == self.map_height:
+            keep[-1] |= WALL_BITS["down"]
+        keep[:, 0] |= WALL_BITS["left"]
+        keep[:, -1] |= WALL_BITS["right"]
+        self.grid.walls[top:bottom] |= band & keep
 
     def check_pygame_exit(self) -> bool:
         for event in pygame.event.get():
@@ -436,29 +670,10 @@ class Map:
 
     def update_canvas(self, n_canvas: pygame.Surface = None) -> None:
         canvas: pygame.Surface = self.canvas if not n_canvas else n_canvas
-        wall_color: str = self.colors["maze_walls"]
-
-        for y in range(self.map_height):
-            for x in range(self.map_width):
-                
-                block: Block = self.map[y][x]  # Get the block at position (x, y)
-                
-                active_traits: list[str] = block.get_traits()  
-                color: tuple = self.generate_height_color(block)
-                if active_traits:
-                    for trait in active_traits:
-                        color = self.colors[trait]
-                pygame.draw.rect(self.canvas, color, (x * self.block_size, y * self.block_size, self.block_size, self.block_size))
-
-                if block.walls["top"]:
-                    pygame.draw.line(canvas, pygame.Color(wall_color), (x * self.block_size, y * self.block_size), ((x + 1) * self.block_size - 1, y * self.block_size), 1)
-                if block.walls["down"]:
-                    pygame.draw.line(canvas, pygame.Color(wall_color), (x * self.block_size, (y + 1) * self.block_size - 1), ((x + 1) * self.block_size - 1, (y + 1) * self.block_size - 1), 1)
-                if block.walls["left"]:
-                    pygame.draw.line(canvas, pygame.Color(wall_color), (x * self.block_size, y * self.block_size), (x * self.block_size, (y + 1) * self.block_size - 1), 1)
-                if block.walls["right"]:
-                    pygame.draw.line(canvas, pygame.Color(wall_color), ((x + 1) * self.block_size - 1, y * self.block_size), ((x + 1) * self.block_size - 1, (y + 1) * self.block_size - 1), 1)
-
+        if self.atlas is None:
+            self.atlas = TileAtlas(self.block_size, self.colors, walls_inside=True)
+        self.atlas.draw_ground(self.canvas, self.grid.traits, self.grid.heights)
+        self.atlas.draw_walls(canvas, self.grid.walls)
 
         for circle in self.location_circles:
             location_name: str = circle["location"]
@@ -469,11 +684,6 @@ class Map:
             r: int = circle["radius"] * self.block_size
             pygame.draw.circle(self.canvas, color, (center_x, center_y), r, width=2)
 
-    def generate_height_color(self, block: Block) -> tuple:
-        color: tuple = self.colors["terrain"]
-        adjusted_color: tuple = tuple(c * block.height for c in color)
-        return adjusted_color
-    
     def show_loop(self) -> None:
         self.visualise(100)
 
@@ -482,6 +692,8 @@ class Map:
             pygame.time.delay(100)
 
     def save_as_image(self, name: str) -> None:
+        if self.canvas is None:
+            self.canvas = pygame.Surface((self.screen_width, self.screen_height))
         self.update_canvas()
         pygame.image.save(self.canvas, f"./res/{name}.png")
 
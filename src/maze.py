@@ -1,134 +1,140 @@
 import json
 import random
+import numpy as np
 import pygame
 import sys
-from gridElements import Cell
+from collections.abc import Iterator
+from gridElements import WALL_BITS
+from mazeGenerators import MAZE_GENERATORS, ALL_WALLS, eller_rows
+from profiler import PROFILER
+
+def block_walls(masks: list[int] | np.ndarray, blocks_in_cell: int) -> np.ndarray:
+    """
+    Block walls of maze cells, `blocks_in_cell` blocks per cell side.
+
+    `masks` is one row of cells or a 2D array of them. Cell walls land on
+    the blocks along the matching cell edge through strided slices, the
+    inside of a cell stays open.
+    """
+    cells: np.ndarray = np.atleast_2d(np.asarray(masks, dtype=np.uint8))
+    band: np.ndarray = np.zeros((cells.shape[0] * blocks_in_cell, cells.shape[1] * blocks_in_cell), dtype=np.uint8)
+    band[0::blocks_in_cell] |= np.repeat(cells & WALL_BITS["top"], blocks_in_cell, axis=1)
+    band[blocks_in_cell - 1::blocks_in_cell] |= np.repeat(cells & WALL_BITS["down"], blocks_in_cell, axis=1)
+    band[:, 0::blocks_in_cell] |= np.repeat(cells & WALL_BITS["left"], blocks_in_cell, axis=0)
+    band[:, blocks_in_cell - 1::blocks_in_cell] |= np.repeat(cells & WALL_BITS["right"], blocks_in_cell, axis=0)
+    return band
 
 class Maze:
-    def __init__(self, path: str, algorithm_visualisation: bool = False, screen: pygame.Surface = None) -> None:
+    def __init__(self, path: str, algorithm_visualisation: bool = False, screen: pygame.Surface = None, rng: random.Random = None, generate: bool = True,
+                 size: tuple[int, int] = None) -> None:
         with open(path, "r") as file:
             data: dict = json.load(file)
 
-        self.maze_width: int = data["maze_width_in_cells"]
-        self.maze_height: int = data["maze_height_in_cells"]
+        self.rng: random.Random = rng if rng else random.Random(data.get("seed"))
+
+        self.maze_width: int
+        self.maze_height: int
+        self.maze_width, self.maze_height = size if size else (data["maze_width_in_cells"], data["maze_height_in_cells"])
 
         self.screen_width: int = data["screen_width_px"]
         self.screen_height: int = data["screen_height_px"]
 
         self.colors: dict = data.get("colors", {})
+        self.algorithm: str = data.get("maze_algorithm", "backtracker")
 
-        self.maze: list[list[Cell]] = []
+        # `WALL_BITS` mask of every cell, indexed [y, x]
+        self.walls: np.ndarray = None
 
-        self.start: Cell = Cell(0, 0)
-        self.end: Cell = Cell(self.maze_width - 1, self.maze_height - 1)
+        self.start: tuple[int, int] = (0, 0)
+        self.end: tuple[int, int] = (self.maze_width - 1, self.maze_height - 1)
 
         self.algorithm_visualisation: bool = algorithm_visualisation
-        self.canvas: pygame.Surface = pygame.Surface((self.screen_width, self.screen_height)) 
+        self.canvas: pygame.Surface = pygame.Surface((self.screen_width, self.screen_height)) if algorithm_visualisation else None 
 
         if algorithm_visualisation:
             self.screen: pygame.Surface = pygame.display.set_mode((self.screen_width, self.screen_height)) if not screen else screen
             pygame.display.set_caption("Maze creation algorithm visualisation")
 
-        self.generate_maze()
+        if generate:
+            self.generate_maze()
+        else:
+            # Walled cells only, filled in by the caller (e.g. from a saved world)
+            self.walls = np.full((self.maze_height, self.maze_width), ALL_WALLS, dtype=np.uint8)
 
-    def remove_walls(self, current_cell: Cell, next_cell: Cell) -> None:
-        dx: int = current_cell.x - next_cell.x
-        dy: int = current_cell.y - next_cell.y
+    def generate_maze(self) -> None:
+        visit = self.visualise_step if self.algorithm_visualisation else None
+        with PROFILER.span("maze.generate"):
+            walls: list[int] = MAZE_GENERATORS[self.algorithm](self.maze_width, self.maze_height, self.rng, visit)
+        self.walls = np.array(walls, dtype=np.uint8).reshape(self.maze_height, self.maze_width)
 
-        if dx == -1:
-            current_cell.walls["right"] = False
-            next_cell.walls["left"] = False
-        elif dx == 1:
-            current_cell.walls["left"] = False
-            next_cell.walls["right"] = False
+    def rows(self) -> Iterator[list[int]]:
+        """Cell wall masks of the generated maze, one row at a time."""
+        return iter(self.walls.tolist())
 
-        if dy == -1:
-            current_cell.walls["down"] = False
-            next_cell.walls["top"] = False
-        elif dy == 1:
-            current_cell.walls["top"] = False
-            next_cell.walls["down"] = False
+    def stream_rows(self, height: int = None) -> Iterator[list[int]]:
+        """
+        Rows of a new `maze_width` cells wide maze from Eller's algorithm.
+
+        Rows are generated as they are consumed and nothing is kept, so
+        memory depends on the width only. `height=None` never ends, for
+        mazes that scroll forever.
+        """
+        return eller_rows(self.maze_width, self.rng, height)
+
+    def visualise_step(self, walls: list[int], cell: int) -> None:
+        self.visualise(10, divmod(cell, self.maze_width)[::-1], walls)
 
-    def generate_maze(self) -> None:
-        for y in range(self.maze_height):
-            self.maze.append([])
-            for x in range(self.maze_width):
-                self.maze[y].append(Cell(x, y))
-                if self.algorithm_visualisation:
-                    self.visualise(0, self.maze[y][x])
-
-        current_cell: Cell = self.maze[self.start.y][self.start.x]
-        stack: list[Cell] = []
-        counter: int = 1
-
-        while counter < self.maze_width * self.maze_height:
-            current_cell.visited = True
-            neighbors: list[Cell] = current_cell.get_neighbors(self.maze)
-            
-            if neighbors:
-                random.shuffle(neighbors)
-                next_cell: Cell = random.choice(neighbors)
-                counter += 1
-                stack.append(next_cell)
-                self.remove_walls(current_cell, next_cell)
-                current_cell = next_cell
-
-                if self.algorithm_visualisation:
-                    self.visualise(100, current_cell)
-            else:
-                current_cell = stack.pop(1 if len(stack) > 0 else 0)
-                if self.algorithm_visualisation:
-                    self.visualise(50, current_cell)
-
-        
     def check_pygame_exit(self) -> bool:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return True
         return False
 
-    def update_canvas(self, current_cell: Cell = None, n_canvas: pygame.Surface = None) -> None:
+    def update_canvas(self, current_cell: tuple[int, int] = None, n_canvas: pygame.Surface = None, walls: list[int] = None) -> None:
         canvas: pygame.Surface = self.canvas if not n_canvas else n_canvas
         wall_color: str = self.colors["maze_walls"]
+        # Flat masks while generating, the finished array otherwise
+        masks: list[int] = walls if walls is not None else self.walls.ravel().tolist()
 
         cell_width: float = self.screen_width / self.maze_width
         cell_height: float = self.screen_height / self.maze_height   
 
-        for y, row in enumerate(self.maze):  
-            for x, cell in enumerate(row): 
-                if (x, y) == (self.start.x, self.start.y):
+        for y in range(self.maze_height):
+            for x in range(self.maze_width):
+                cell: int = masks[y * self.maze_width + x]
+                if (x, y) == self.start:
                     pygame.draw.rect(
                         canvas,
                         (100, 100, 255), 
                         (x * cell_width, y * cell_height, cell_width, cell_height)
                     )
 
-                if (x, y) == (self.end.x, self.end.y):
+                if (x, y) == self.end:
                     pygame.draw.rect(
                         canvas,
                         (255, 100, 100),  
                         (x * cell_width, y * cell_height, cell_width, cell_height)
                     )
 
-                if current_cell and (x, y) == (current_cell.x, current_cell.y):
+                if (x, y) == current_cell:
                     pygame.draw.rect(
                         canvas,
                         (200, 255, 200, 100),  
                         (x * cell_width, y * cell_height, cell_width, cell_height)
                     )
 
-                if cell.walls["top"]:
+                if cell & WALL_BITS["top"]:
                     pygame.draw.line(canvas, pygame.Color(wall_color), (x * cell_width, y * cell_height), ((x + 1) * cell_width - 1, y * cell_height), 1)
-                if cell.walls["down"]:
+                if cell & WALL_BITS["down"]:
                     pygame.draw.line(canvas, pygame.Color(wall_color), (x * cell_width, (y + 1) * cell_height - 1), ((x + 1) * cell_width - 1, (y + 1) * cell_height - 1), 1)
-                if cell.walls["left"]:
+                if cell & WALL_BITS["left"]:
                     pygame.draw.line(canvas, pygame.Color(wall_color), (x * cell_width, y * cell_height), (x * cell_width, (y + 1) * cell_height - 1), 1)
-                if cell.walls["right"]:
+                if cell & WALL_BITS["right"]:
                     pygame.draw.line(canvas, pygame.Color(wall_color), ((x + 1) * cell_width - 1, y * cell_height), ((x + 1) * cell_width - 1, (y + 1) * cell_height - 1), 1)
 
-    def visualise(self, delay: int, current_cell: Cell = None) -> None:
+    def visualise(self, delay: int, current_cell: tuple[int, int] = None, walls: list[int] = None) -> None:
         self.canvas.fill(pygame.Color(self.colors["maze_path"]))
-        self.update_canvas(current_cell)
+        self.update_canvas(current_cell, walls=walls)
         if self.check_pygame_exit():
             sys.exit()
         self.screen.fill(pygame.Color(self.colors["maze_path"]))
@@ -145,6 +151,8 @@ class Maze:
             pygame.time.delay(100)
 
     def save_as_image(self, name: str) -> None:
+        if self.canvas is None:
+            self.canvas = pygame.Surface((self.screen_width, self.screen_height))
         self.update_canvas()
         pygame.image.save(self.canvas, f"./res/{name}.png")
 
@@ -0,0 +1,236 @@
+import random
+from collections.abc import Callable, Iterator
+import numpy as np
+from gridElements import WALL_BITS
+
+# Every generator returns the walls of all cells as one flat list of
+# `WALL_BITS` masks, indexed by `y * width + x`. Bulk random numbers come
+# from a NumPy generator seeded off `rng`, so a seed still fixes the maze.
+
+ALL_WALLS: int = WALL_BITS["right"] | WALL_BITS["left"] | WALL_BITS["top"] | WALL_BITS["down"]
+
+# Direction codes: (bit removed from the cell, bit removed from the neighbour)
+RIGHT, LEFT, DOWN, UP = 0, 1, 2, 3
+CARVE_BITS: tuple[tuple[int, int], ...] = (
+    (WALL_BITS["right"], WALL_BITS["left"]),
+    (WALL_BITS["left"], WALL_BITS["right"]),
+    (WALL_BITS["down"], WALL_BITS["top"]),
+    (WALL_BITS["top"], WALL_BITS["down"])
+)
+
+Visit = Callable[[list[int], int], None]
+
+def numpy_rng(rng: random.Random) -> np.random.Generator:
+    return np.random.default_rng(rng.getrandbits(64))
+
+def backtracker(width: int, height: int, rng: random.Random, visit: Visit = None) -> list[int]:
+    """Recursive backtracker (randomized depth-first search) with an explicit stack."""
+    size: int = width * height
+    walls: list[int] = [ALL_WALLS] * size
+    visited: bytearray = bytearray(size)
+    # One draw per carved passage, there are exactly `size - 1` of them
+    draws: list[float] = numpy_rng(rng).random(size).tolist()
+    carved: int = 0
+
+    stack: list[int] = [0]
+    push = stack.append
+    pop = stack.pop
+    last_column: int = width - 1
+    visited[0] = 1
+    while stack:
+        cell: int = stack[-1]
+        x: int = cell % width
+        # Candidates are packed as `neighbour * 4 + direction`
+        candidates: list[int] = []
+        if x != last_column and not visited[cell + 1]:
+            candidates.append(cell * 4 + 4 + RIGHT)
+        if x and not visited[cell - 1]:
+            candidates.append(cell * 4 - 4 + LEFT)
+        if cell + width < size and not visited[cell + width]:
+            candidates.append((cell + width) * 4 + DOWN)
+        if cell >= width and not visited[cell - width]:
+            candidates.append((cell - width) * 4 + UP)
+
+        if not candidates:
+            pop()
+            continue
+
+        chosen: int = candidates[int(draws[carved] * len(candidates))] if len(candidates) > 1 else candidates[0]
+        carved += 1
+        neighbour: int = chosen >> 2
+        bit, opposite = CARVE_BITS[chosen & 3]
+        walls[cell] &= ~bit
+        walls[neighbour] &= ~opposite
+        visited[neighbour] = 1
+        push(neighbour)
+        if visit:
+            visit(walls, neighbour)
+    return walls
+
+def kruskal(width: int, height: int, rng: random.Random, visit: Visit = None) -> list[int]:
+    """Randomized Kruskal: open shuffled walls between cells of different sets (union-find)."""
+    size: int = width * height
+    walls: list[int] = [ALL_WALLS] * size
+    parents: list[int] = list(range(size))
+
+    # Edge `cell * 2` is the wall right of `cell`, `cell * 2 + 1` the wall below it
+    edges: np.ndarray = np.arange(2 * size, dtype=np.int64)
+    edges = edges[((edges & 1 == 0) & ((edges >> 1) % width < width - 1)) | ((edges & 1 == 1) & ((edges >> 1) < size - width))]
+    right_bit, left_bit = CARVE_BITS[RIGHT]
+    down_bit, top_bit = CARVE_BITS[DOWN]
+
+    order: np.ndarray = numpy_rng(rng).permutation(edges)
+    cells: list[int] = (order >> 1).tolist()
+    vertical: list[int] = (order & 1).tolist()
+    neighbours: list[int] = ((order >> 1) + np.where(order & 1, width, 1)).tolist()
+
+    remaining: int = size - 1
+    for cell, neighbour, down in zip(cells, neighbours, vertical):
+        a: int = cell
+        while parents[a] != a:
+            parents[a] = a = parents[parents[a]]
+        b: int = neighbour
+        while parents[b] != b:
+            parents[b] = b = parents[parents[b]]
+        if a == b:
+            continue
+
+        parents[b] = a
+        if down:
+            walls[cell] &= ~down_bit
+            walls[neighbour] &= ~top_bit
+        else:
+            walls[cell] &= ~right_bit
+            walls[neighbour] &= ~left_bit
+        if visit:
+            visit(walls, neighbour)
+        remaining -= 1
+        if not remaining:
+            break
+    return walls
+
+def wilson(width: int, height: int, rng: random.Random, visit: Visit = None) -> list[int]:
+    """
+    Wilson's algorithm: loop-erased random walks, a uniformly random maze.
+
+    Unbiased, but the first walks have to find a tiny maze, so it is much
+    slower than the others on large sizes.
+    """
+    size: int = width * height
+    walls: list[int] = [ALL_WALLS] * size
+    in_maze: bytearray = bytearray(size)
+    # Last direction the walk left each cell in, overwriting it erases loops
+    exits: list[int] = [0] * size
+    generator: np.random.Generator = numpy_rng(rng)
+    steps: list[int] = []
+    step: int = 0
+    offsets: tuple[int, ...] = (1, -1, width, -width)
+
+    in_maze[generator.integers(size)] = 1
+    for start in generator.permutation(size).tolist():
+        if in_maze[start]:
+            continue
+
+        cell: int = start
+        while not in_maze[cell]:
+            if step == len(steps):
+                steps = generator.integers(0, 4, 1 << 16).tolist()
+                step = 0
+            direction: int = steps[step]
+            step += 1
+            x: int = cell % width
+            if (
+                (direction == RIGHT and x == width - 1) or
+                (direction == LEFT and x == 0) or
+                (direction == DOWN and cell + width >= size) or
+                (direction == UP and cell < width)
+            ):
+                continue
+            exits[cell] = direction
+            cell += offsets[direction]
+
+        cell = start
+        while not in_maze[cell]:
+            direction = exits[cell]
+            neighbour: int = cell + offsets[direction]
+            bit, opposite = CARVE_BITS[direction]
+            walls[cell] &= ~bit
+            walls[neighbour] &= ~opposite
+            in_maze[cell] = 1
+            if visit:
+                visit(walls, cell)
+            cell = neighbour
+    return walls
+
+def eller_rows(width: int, rng: random.Random, height: int = None) -> Iterator[list[int]]:
+    """
+    Eller's algorithm, yielding the walls of one row at a time.
+
+    Only the set labels of the current row are kept, so memory depends on
+    `width` alone. With `height=None` rows keep coming; the last row of a
+    bounded maze joins all remaining sets.
+    """
+    generator: np.random.Generator = numpy_rng(rng)
+    right_bit, left_bit = CARVE_BITS[RIGHT]
+    down_bit, top_bit = CARVE_BITS[DOWN]
+
+    # Set label per column; columns with a passage from above keep theirs
+    labels: list[int] = [-1] * width
+    next_label: int = 0
+    y: int = 0
+    while height is None or y < height:
+        last: bool = height is not None and y == height - 1
+        row: list[int] = [ALL_WALLS] * width
+        for x in range(width):
+            if labels[x] < 0:
+                labels[x] = next_label
+                next_label += 1
+            else:
+                row[x] &= ~top_bit
+
+        # Merge neighbours of different sets, always on the last row
+        members: dict[int, list[int]] = {}
+        for x in range(width):
+            members.setdefault(labels[x], []).append(x)
+        draws: list[float] = generator.random(3 * width).tolist()
+        for x in range(width - 1):
+            a: int = labels[x]
+            b: int = labels[x + 1]
+            if a == b or not (last or draws[x] < 0.5):
+                continue
+            if len(members[a]) < len(members[b]):
+                a, b = b, a
+            for column in members[b]:
+                labels[column] = a
+            members[a].extend(members.pop(b))
+            row[x] &= ~right_bit
+            row[x + 1] &= ~left_bit
+
+        if not last:
+            # Every set continues down at least once, other columns by chance
+            below: list[int] = [-1] * width
+            for label, columns in members.items():
+                keep: int = columns[int(draws[2 * width + columns[0]] * len(columns))]
+                for column in columns:
+                    if column == keep or draws[width + column] < 0.3:
+                        row[column] &= ~down_bit
+                        below[column] = label
+            labels = below
+        yield row
+        y += 1
+
+def eller(width: int, height: int, rng: random.Random, visit: Visit = None) -> list[int]:
+    """Whole maze from `eller_rows`."""
+    walls: list[int] = []
+    for row in eller_rows(width, rng, height):
+        walls.extend(row)
+        if visit:
+            visit(walls + [ALL_WALLS] * (width * height - len(walls)), len(walls) - 1)
+    return walls
+
+MAZE_GENERATORS: dict[str, Callable[..., list[int]]] = {
+    "backtracker": backtracker,
+    "kruskal": kruskal,
+    "wilson": wilson,
+    "eller": eller
+}
@@ -1,101 +1,613 @@
+import heapq
+from array import array
+import numpy as np
 from snake import Snake, SnakeBodyBlock, Apple
-from gridElements import Block, Node
-from collections import deque
+from gridElements import Block, Grid, WALL_BITS, TRAIT_BITS
+from profiler import PROFILER
+from collections.abc import Callable, Iterable, Iterator
+
+RIGHT: int = WALL_BITS["right"]
+LEFT: int = WALL_BITS["left"]
+TOP: int = WALL_BITS["top"]
+DOWN: int = WALL_BITS["down"]
+
+# (open direction bit, dx, dy) in the order searchers expand neighbours
+DIRECTIONS: list[tuple[int, int, int]] = [(RIGHT, 1, 0), (LEFT, -1, 0), (DOWN, 0, 1), (TOP, 0, -1)]
+
+class PassabilityIndex:
+    """
+    Static adjacency index of a `Grid`.
+
+    `open_directions` holds a 4-bit mask per block with a bit set (same bits
+    as `WALL_BITS`) for every direction the block can be left in, taking
+    walls of both blocks and the map border into account. `passable` marks
+    blocks a path may enter (no traits apart from river). Flat copies indexed
+    by `y * width + x` are kept for the search loops.
+    """
+    def __init__(self, grid: Grid):
+        self.grid: Grid = grid
+        self.width: int = grid.width
+        self.height: int = grid.height
+        self.open_directions: np.ndarray = np.zeros((self.height, self.width), dtype=np.uint8)
+        self.passable: np.ndarray = np.zeros((self.height, self.width), dtype=bool)
+        self.open_flat: bytearray = bytearray()
+        self.passable_flat: bytearray = bytearray()
+        self.river_flat: bytearray = bytearray()
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        walls: np.ndarray = self.grid.walls
+        open_directions: np.ndarray = self.open_directions
+        open_directions.fill(0)
+
+        open_directions[:, :-1] |= np.where(((walls[:, :-1] & RIGHT) | (walls[:, 1:] & LEFT)) == 0, RIGHT, 0).astype(np.uint8)
+        open_directions[:, 1:] |= np.where(((walls[:, 1:] & LEFT) | (walls[:, :-1] & RIGHT)) == 0, LEFT, 0).astype(np.uint8)
+        open_directions[:-1, :] |= np.where(((walls[:-1, :] & DOWN) | (walls[1:, :] & TOP)) == 0, DOWN, 0).astype(np.uint8)
+        open_directions[1:, :] |= np.where(((walls[1:, :] & TOP) | (walls[:-1, :] & DOWN)) == 0, TOP, 0).astype(np.uint8)
+
+        self.passable[:] = (self.grid.traits & (~TRAIT_BITS["river"] & 0xFF)) == 0
+
+        self.open_flat = bytearray(self.open_directions.tobytes())
+        self.passable_flat = bytearray(self.passable.tobytes())
+        self.river_flat = bytearray(((self.grid.traits & TRAIT_BITS["river"]) != 0).tobytes())
+
+    def update_walls(self, positions: Iterable[tuple[int, int]]) -> None:
+        """Recompute open directions for changed blocks and their neighbours."""
+        changed: set[tuple[int, int]] = set()
+        for x, y in positions:
+            changed.add((x, y))
+            for _, dx, dy in DIRECTIONS:
+                if 0 <= x + dx < self.width and 0 <= y + dy < self.height:
+                    changed.add((x + dx, y + dy))
+
+        for x, y in changed:
+            mask: int = self.compute_open_directions(x, y)
+            self.open_directions[y, x] = mask
+            self.open_flat[y * self.width + x] = mask
+
+    def compute_open_directions(self, x: int, y: int) -> int:
+        walls: np.ndarray = self.grid.walls
+        own: int = int(walls[y, x])
+        mask: int = 0
+        if x < self.width - 1 and not own & RIGHT and not walls[y, x + 1] & LEFT:
+            mask |= RIGHT
+        if x > 0 and not own & LEFT and not walls[y, x - 1] & RIGHT:
+            mask |= LEFT
+        if y < self.height - 1 and not own & DOWN and not walls[y + 1, x] & TOP:
+            mask |= DOWN
+        if y > 0 and not own & TOP and not walls[y - 1, x] & DOWN:
+            mask |= TOP
+        return mask
+
+class SearchArena:
+    """
+    Buffers shared by every search over one grid.
+
+    Blocks are addressed by `y * width + x`. A block counts as visited
+    or a target only while its stamp equals the current
+    `generation`, so a new search starts with a counter increment instead
+    of fresh sets, nodes and queues. Stamps are uint32 and parents, depths
+    and queues int32 buffers, a path is recovered by walking `parents`
+    until -1.
+
+    `weighted` adds the `closed` stamps and `costs` that `AStar` needs,
+    `backward` the second set of buffers of `BidirectionalBFS`; other
+    searchers leave them `None`.
+    """
+    def __init__(self, size: int, weighted: bool = False, backward: bool = False):
+        self.size: int = size
+        self.generation: int = 0
+        self.visited: array = array("I", [0]) * size
+        self.targets: array = array("I", [0]) * size
+        self.parents: array = array("i", [-1]) * size
+        self.depths: array = array("i", [0]) * size
+        # Every block enters a queue at most once per search
+        self.queue: array = array("i", [0]) * size
+        self.heap: list[tuple[int, int, int, int]] = []
+
+        self.closed: array = array("I", [0]) * size if weighted else None
+        self.costs: array = array("i", [0]) * size if weighted else None
+
+        self.backward_visited: array = array("I", [0]) * size if backward else None
+        self.backward_parents: array = array("i", [-1]) * size if backward else None
+        self.backward_depths: array = array("i", [0]) * size if backward else None
+        self.backward_queue: array = array("i", [0]) * size if backward else None
+
+    def next_generation(self) -> int:
+        self.generation += 1
+        self.heap.clear()
+        return self.generation
+
+def min_manhattan(position: tuple[int, int], targets: set[tuple[int, int]]) -> int:
+    """Manhattan distance from `position` to the closest of `targets`."""
+    x, y = position
+    return min((abs(x - tx) + abs(y - ty) for tx, ty in targets), default=0)
+
+# Up to this many targets a plain scan beats the bucket lookup
+NEAREST_SCAN_LIMIT: int = 16
+
+class NearestTargets:
+    """
+    Manhattan distance to the closest target, with targets bucketed on a
+    coarse grid.
+
+    A query looks at rings of buckets around the position and stops once
+    no further ring can hold a closer target, so with many targets (apples)
+    an A* estimate no longer scans all of them.
+    """
+    def __init__(self, targets: set[tuple[int, int]], bucket_size: int = 16):
+        self.targets: set[tuple[int, int]] = set(targets)
+        self.bucket_size: int = bucket_size
+        self.buckets: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        for x, y in targets:
+            self.buckets.setdefault((x // bucket_size, y // bucket_size), []).append((x, y))
+        columns: list[int] = [bx for bx, _ in self.buckets]
+        rows: list[int] = [by for _, by in self.buckets]
+        self.extent: tuple[int, int, int, int] = (min(columns, default=0), min(rows, default=0), max(columns, default=0), max(rows, default=0))
+
+    def ring(self, bx: int, by: int, radius: int) -> Iterator[tuple[int, int]]:
+        """Buckets at Chebyshev distance `radius` from bucket (bx, by)."""
+        if radius == 0:
+            yield (bx, by)
+            return
+        for dx in range(-radius, radius + 1):
+            yield (bx + dx, by - radius)
+            yield (bx + dx, by + radius)
+        for dy in range(-radius + 1, radius):
+            yield (bx - radius, by + dy)
+            yield (bx + radius, by + dy)
+
+    def distance(self, position: tuple[int, int], targets: set[tuple[int, int]] = None) -> int:
+        """Same value as `min_manhattan(position, targets)`; `targets` is only there to fit the heuristic signature."""
+        if len(self.targets) <= NEAREST_SCAN_LIMIT:
+            return min_manhattan(position, self.targets)
+
+        x, y = position
+        size: int = self.bucket_size
+        bx: int = x // size
+        by: int = y // size
+        left, top, right, bottom = self.extent
+        last_radius: int = max(bx - left, right - bx, by - top, bottom - by)
+        best: int = -1
+        for radius in range(last_radius + 1):
+            for bucket in self.ring(bx, by, radius):
+                for tx, ty in self.buckets.get(bucket, ()):
+                    distance: int = abs(x - tx) + abs(y - ty)
+                    if best < 0 or distance < best:
+                        best = distance
+            # Blocks in the next ring are at least `radius * size + 1` away on one axis
+            if 0 <= best <= radius * size + 1:
+                break
+        return max(best, 0)
 
 class BFS:
-    def __init__(self, map: list[list[Block]]):
-        self.map: list[list[Block]] = map
-        self.bounds: tuple[int, int] = (len(self.map[0]), len(self.map))
+    def __init__(self, map: Grid):
+        self.map: Grid = map
+        self.bounds: tuple[int, int] = (map.width, map.height)
+        self.index: PassabilityIndex = PassabilityIndex(map)
+        self.arena: SearchArena = self.create_arena(map.width * map.height)
+        # (open direction bit, flat index offset) in DIRECTIONS order
+        self.offsets: list[tuple[int, int]] = [(bit, dy * map.width + dx) for bit, dx, dy in DIRECTIONS]
         self.path: list[tuple[int, int]] = []
         self.longest_path: list[tuple[int, int]] = []
-        self.snake_values: set[tuple[int, int]] = set()
+        # Body block counts of the snake being planned for (`Snake.occupancy`)
+        self.occupancy: list[int] | bytearray = bytearray(map.width * map.height)
         self.target_values: set[tuple[int, int]] = set()
+        self.expanded_nodes: int = 0
+        self.previous_vacated: int = 0
+        self.previous_targets: set[tuple[int, int]] = set()
+        self.walls_changed: bool = False
         
-    def get_snake_values(self, snake: Snake):
-        for block in snake.body:
-            self.snake_values.add((block.x, block.y))
-            
+    def create_arena(self, size: int) -> SearchArena:
+        return SearchArena(size)
+
+    def use_snake(self, snake: Snake) -> None:
+        if len(snake.occupancy) != self.arena.size:
+            raise ValueError("Snake map size does not match the searched grid")
+        self.occupancy = snake.occupancy
+
     def get_target_values(self, targets: list[any]):
+        self.target_values.clear()
+        width: int = self.bounds[0]
+        target_stamps: array = self.arena.targets
+        generation: int = self.arena.generation
         for block in targets:
             self.target_values.add((block.x, block.y))
+            if self.check_bounds((block.x, block.y)):
+                target_stamps[block.y * width + block.x] = generation
+
+    def update_walls(self, positions: Iterable[tuple[int, int]]) -> None:
+        self.index.update_walls(positions)
+        self.walls_changed = True
+
+    def update_path(self, snake: Snake, targets: list[any]) -> None:
+        """
+        Replan only when the previous path can no longer be trusted.
+
+        The path is kept, minus the block the head left, while the head
+        stays on it, no body block lies on it, no targets were added and the
+        walls did not change. Blocks freed by the tail since the last call
+        force a new search only if they could lie on a cheaper path, judged
+        by the Manhattan distance head -> freed block -> target.
+        """
+        self.use_snake(snake)
+        target_positions: set[tuple[int, int]] = {(target.x, target.y) for target in targets}
+        vacated: list[tuple[int, int]] = snake.vacated_since(self.previous_vacated)
+        if not self.reuse_path(snake, vacated, target_positions):
+            with PROFILER.span("search.create_path"):
+                self.create_path(snake, targets)
+            PROFILER.count("search.expanded", self.expanded_nodes)
+        self.previous_vacated = snake.vacated_total
+        self.previous_targets = target_positions
+        self.walls_changed = False
+
+    def reuse_path(self, snake: Snake, vacated: list[tuple[int, int]], target_positions: set[tuple[int, int]]) -> bool:
+        path: list[tuple[int, int]] = self.path
+        if self.walls_changed or vacated is None or not path or path[-1] not in target_positions:
+            return False
+        if not target_positions <= self.previous_targets:
+            return False
+
+        head: tuple[int, int] = (snake.body[0].x, snake.body[0].y)
+        if head == path[0]:
+            remaining: list[tuple[int, int]] = path
+        elif len(path) > 1 and head == path[1]:
+            remaining = path[1:]
+        else:
+            return False
+
+        width: int = self.bounds[0]
+        occupancy: list[int] = self.occupancy
+        if any(occupancy[y * width + x] for x, y in remaining[1:]):
+            return False
+
+        cost: int = self.path_cost(remaining)
+        for x, y in vacated:
+            if occupancy[y * width + x]:
+                continue
+            if abs(x - head[0]) + abs(y - head[1]) + min_manhattan((x, y), target_positions) < cost:
+                return False
+
+        self.path = remaining
+        self.longest_path = []
+        self.expanded_nodes = 0
+        return True
+
+    def path_cost(self, path: list[tuple[int, int]]) -> int:
+        return len(path) - 1
                 
     def check_bounds(self, position: tuple[int, int]) -> bool:
         return (0 <= position[0] < self.bounds[0] and
                 0 <= position[1] < self.bounds[1])
         
     def check_block_collision(self, position: tuple[int, int])  -> bool: 
-        return (position not in self.snake_values and
-                (not self.map[position[1]][position[0]].get_traits() or
-                 self.map[position[1]][position[0]].get_traits() == ["river"]))
+        return (not self.occupancy[position[1] * self.bounds[0] + position[0]] and
+                self.index.passable_flat[position[1] * self.bounds[0] + position[0]])
          
     def check_wall_collision(self, direction: tuple[int, int], current_position: tuple[int, int], next_position: tuple[int, int])  -> bool: 
-        current_pos_walls: list[str] = self.map[current_position[1]][current_position[0]].get_walls()
-        next_pos_walls: list[str] = self.map[next_position[1]][next_position[0]].get_walls() 
-
-        current_pos_walls = current_pos_walls if current_pos_walls else []
-        next_pos_walls = next_pos_walls if next_pos_walls else []
-        if current_pos_walls or next_pos_walls:
-            if direction[0] == 1 and ("right" in current_pos_walls or "left" in next_pos_walls):
-                return False
-            elif direction[0] == -1 and ("left" in current_pos_walls or "right" in next_pos_walls):
-                return False
-            
-            if direction[1] == 1 and ("down" in current_pos_walls or "top" in next_pos_walls):
-                return False
-            elif direction[1] == -1 and ("top" in current_pos_walls or "down" in next_pos_walls):
-                return False
-        
+        open_directions: int = self.index.open_flat[current_position[1] * self.bounds[0] + current_position[0]]
+        for bit, dx, dy in DIRECTIONS:
+            if (dx, dy) == direction:
+                return bool(open_directions & bit)
         return True
         
-    def create_path(self, snake: Snake, targets: list[any]):
+    def iter_chain(self, index: int, parents: array) -> Iterator[tuple[int, int]]:
+        """Positions from flat `index` back to the root of its search."""
+        width: int = self.bounds[0]
+        while index != -1:
+            yield (index % width, index // width)
+            index = parents[index]
+
+    def trace_chain(self, index: int, parents: array) -> list[tuple[int, int]]:
+        return list(self.iter_chain(index, parents))
+
+    def trace_path(self, index: int) -> list[tuple[int, int]]:
+        path: list[tuple[int, int]] = self.trace_chain(index, self.arena.parents)
+        path.reverse()
+        return path
+
+    def start_search(self, snake: Snake, targets: list[any]) -> int:
         self.path = []
         self.longest_path = []
-        self.get_snake_values(snake)
+        self.expanded_nodes = 0
+        generation: int = self.arena.next_generation()
+        self.use_snake(snake)
         self.get_target_values(targets)
-        
-        start: tuple[int, int] = (snake.body[0].x, snake.body[0].y)
-        directions: list[tuple[int, int]] = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-
-        # Initialize BFS queue with Node
-        start_node = Node(start)
-        queue = deque([start_node])
-        visited: set[tuple[int, int]] = {start}
-
-        # Keep track of the farthest node and its depth
-        farthest_node = start_node
-        max_depth = 0
-
-        while queue:
-            current_node: Node = queue.popleft()
-            current_position: tuple[int, int] = current_node.position
-            depth = current_node.depth  
-            
+        return generation
+
+    def create_path(self, snake: Snake, targets: list[any]):
+        generation: int = self.start_search(snake, targets)
+
+        open_flat: bytearray = self.index.open_flat
+        passable_flat: bytearray = self.index.passable_flat
+        offsets: list[tuple[int, int]] = self.offsets
+        visited: array = self.arena.visited
+        occupancy: list[int] = self.occupancy
+        target_stamps: array = self.arena.targets
+        parents: array = self.arena.parents
+        depths: array = self.arena.depths
+        queue: array = self.arena.queue
+
+        start: int = snake.body[0].y * self.bounds[0] + snake.body[0].x
+        visited[start] = generation
+        parents[start] = -1
+        depths[start] = 0
+        queue[0] = start
+        queue_head: int = 0
+        queue_tail: int = 1
+
+        # Keep track of the farthest block and its depth
+        farthest: int = start
+        max_depth: int = 0
+
+        while queue_head < queue_tail:
+            current: int = queue[queue_head]
+            queue_head += 1
+            depth: int = depths[current]
+
             if depth > max_depth:
-                farthest_node = current_node
+                farthest = current
                 max_depth = depth
 
-            if current_position in self.target_values:
-                while current_node is not None:
-                    self.path.append(current_node.position)
-                    current_node = current_node.parent
-                self.path.reverse()
+            if target_stamps[current] == generation:
+                self.expanded_nodes = queue_head
+                self.path = self.trace_path(current)
                 return
 
-            for dx, dy in directions:
-                neighbor_position = (current_position[0] + dx, current_position[1] + dy)
-                direction = (dx, dy)
+            open_directions: int = open_flat[current]
+            for bit, offset in offsets:
+                if not open_directions & bit:
+                    continue
+                neighbor: int = current + offset
                 if (
-                    self.check_bounds(neighbor_position) and
-                    neighbor_position not in visited and
-                    self.check_block_collision(neighbor_position) and
-                    self.check_wall_collision(direction, current_position, neighbor_position)
+                    visited[neighbor] != generation and
+                    not occupancy[neighbor] and
+                    passable_flat[neighbor]
                 ):
-                    neighbor_node = Node(neighbor_position, current_node, depth=depth + 1)
-                    queue.append(neighbor_node)
-                    visited.add(neighbor_position)
+                    visited[neighbor] = generation
+                    parents[neighbor] = current
+                    depths[neighbor] = depth + 1
+                    queue[queue_tail] = neighbor
+                    queue_tail += 1
 
         # If no path to an apple is found, reconstruct the longest path
-        while farthest_node is not None:
-            self.longest_path.append(farthest_node.position)
-            farthest_node = farthest_node.parent
-        self.longest_path.reverse()
\ No newline at end of file
+        self.expanded_nodes = queue_head
+        self.longest_path = self.trace_path(farthest)
+
+class AStar(BFS):
+    """
+    Best-first search towards the closest target.
+
+    Nodes are ordered by path cost plus `heuristic(position, target_values)`.
+    Leaving a river block costs `river_weight` steps instead of one, so with
+    the snake's `speed_in_river` the path goes around slow water when that is
+    shorter. Any heuristic that never overestimates the step count keeps the
+    paths optimal.
+    """
+    def __init__(self, map: Grid, heuristic: Callable[[tuple[int, int], set[tuple[int, int]]], int] = None, river_weight: int = 1):
+        super().__init__(map)
+        # `None` estimates with `NearestTargets`, rebuilt when the targets change
+        self.heuristic: Callable[[tuple[int, int], set[tuple[int, int]]], int] = heuristic
+        self.nearest: NearestTargets = None
+        self.river_weight: int = river_weight
+
+    def create_arena(self, size: int) -> SearchArena:
+        return SearchArena(size, weighted=True)
+
+    def path_cost(self, path: list[tuple[int, int]]) -> int:
+        width: int = self.bounds[0]
+        river_flat: bytearray = self.index.river_flat
+        return sum(self.river_weight if river_flat[y * width + x] else 1 for x, y in path[:-1])
+
+    def create_path(self, snake: Snake, targets: list[any]):
+        if not targets:
+            # Nothing to head for, the longest path comes from a plain flood
+            return super().create_path(snake, targets)
+        generation: int = self.start_search(snake, targets)
+
+        width: int = self.bounds[0]
+        open_flat: bytearray = self.index.open_flat
+        passable_flat: bytearray = self.index.passable_flat
+        river_flat: bytearray = self.index.river_flat
+        offsets: list[tuple[int, int]] = self.offsets
+        target_values: set[tuple[int, int]] = self.target_values
+        heuristic = self.heuristic
+        if heuristic is None:
+            if self.nearest is None or self.nearest.targets != target_values:
+                self.nearest = NearestTargets(target_values)
+            heuristic = self.nearest.distance
+        river_weight: int = self.river_weight
+
+        # `visited` marks blocks with a valid entry in `costs`
+        visited: array = self.arena.visited
+        closed: array = self.arena.closed
+        occupancy: list[int] = self.occupancy
+        target_stamps: array = self.arena.targets
+        parents: array = self.arena.parents
+        depths: array = self.arena.depths
+        costs: array = self.arena.costs
+
+        start: int = snake.body[0].y * width + snake.body[0].x
+        visited[start] = generation
+        parents[start] = -1
+        depths[start] = 0
+        costs[start] = 0
+
+        # Heap entries are (cost + estimate, estimate, push order, block)
+        counter: int = 0
+        start_estimate: int = heuristic((snake.body[0].x, snake.body[0].y), target_values)
+        open_heap: list[tuple[int, int, int, int]] = self.arena.heap
+        open_heap.append((start_estimate, start_estimate, counter, start))
+
+        farthest: int = start
+        max_depth: int = 0
+        expanded: int = 0
+
+        while open_heap:
+            current: int = heapq.heappop(open_heap)[3]
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
+            expanded += 1
+
+            depth: int = depths[current]
+            if depth > max_depth:
+                farthest = current
+                max_depth = depth
+
+            if target_stamps[current] == generation:
+                self.expanded_nodes = expanded
+                self.path = self.trace_path(current)
+                return
+
+            open_directions: int = open_flat[current]
+            cost: int = costs[current] + (river_weight if river_flat[current] else 1)
+            for bit, offset in offsets:
+                if not open_directions & bit:
+                    continue
+                neighbor: int = current + offset
+                if (
+                    closed[neighbor] == generation or
+                    occupancy[neighbor] or
+                    not passable_flat[neighbor] or
+                    (visited[neighbor] == generation and cost >= costs[neighbor])
+                ):
+                    continue
+                visited[neighbor] = generation
+                costs[neighbor] = cost
+                parents[neighbor] = current
+                depths[neighbor] = depth + 1
+                estimate: int = heuristic((neighbor % width, neighbor // width), target_values)
+                counter += 1
+                heapq.heappush(open_heap, (cost + estimate, estimate, counter, neighbor))
+
+        # No target is reachable, every reachable block has been closed
+        self.expanded_nodes = expanded
+        self.longest_path = self.trace_path(farthest)
+
+class BidirectionalBFS(BFS):
+    """
+    Breadth-first search run from the head and from all targets at once.
+
+    Both searches grow one layer at a time, always the smaller frontier,
+    until they touch, so paths are as short as the plain `BFS` ones while
+    far fewer blocks are expanded. Once the target side runs out no target
+    is reachable and the head side is flooded alone for the longest path.
+    """
+    def create_arena(self, size: int) -> SearchArena:
+        return SearchArena(size, backward=True)
+
+    def expand_layer(self, queue: array, layer_start: int, layer_end: int,
+                     visited: array, parents: array, depths: array,
+                     other_visited: array, other_depths: array) -> tuple[int, tuple[int, int]]:
+        """
+        Expand `queue[layer_start:layer_end]`, appending the next layer.
+
+        Returns the end of the next layer and the closest `(block, block on
+        the other side)` pair where the searches touched, if any.
+        """
+        generation: int = self.arena.generation
+        open_flat: bytearray = self.index.open_flat
+        passable_flat: bytearray = self.index.passable_flat
+        occupancy: list[int] = self.occupancy
+
+        queue_tail: int = layer_end
+        meeting: tuple[int, int] = None
+        meeting_depth: int = -1
+        for i in range(layer_start, layer_end):
+            current: int = queue[i]
+            open_directions: int = open_flat[current]
+            for bit, offset in self.offsets:
+                if not open_directions & bit:
+                    continue
+                neighbor: int = current + offset
+                if other_visited[neighbor] == generation:
+                    # Whole layer is scanned so the shortest join is kept
+                    if meeting is None or other_depths[neighbor] < meeting_depth:
+                        meeting = (current, neighbor)
+                        meeting_depth = other_depths[neighbor]
+                    continue
+                if (
+                    visited[neighbor] != generation and
+                    not occupancy[neighbor] and
+                    passable_flat[neighbor]
+                ):
+                    visited[neighbor] = generation
+                    parents[neighbor] = current
+                    depths[neighbor] = depths[current] + 1
+                    queue[queue_tail] = neighbor
+                    queue_tail += 1
+        self.expanded_nodes += layer_end - layer_start
+        return queue_tail, meeting
+
+    def create_path(self, snake: Snake, targets: list[any]):
+        generation: int = self.start_search(snake, targets)
+
+        width: int = self.bounds[0]
+        passable_flat: bytearray = self.index.passable_flat
+        arena: SearchArena = self.arena
+
+        start: int = snake.body[0].y * width + snake.body[0].x
+        if arena.targets[start] == generation:
+            self.path = [(snake.body[0].x, snake.body[0].y)]
+            return
+
+        arena.visited[start] = generation
+        arena.parents[start] = -1
+        arena.depths[start] = 0
+        arena.queue[0] = start
+        forward_start: int = 0
+        forward_end: int = 1
+
+        # Only targets the forward search could step onto are seeded
+        backward_start: int = 0
+        backward_end: int = 0
+        for x, y in self.target_values:
+            target: int = y * width + x
+            if (
+                self.check_bounds((x, y)) and
+                not self.occupancy[target] and
+                passable_flat[target]
+            ):
+                arena.backward_visited[target] = generation
+                arena.backward_parents[target] = -1
+                arena.backward_depths[target] = 0
+                arena.backward_queue[backward_end] = target
+                backward_end += 1
+
+        farthest: int = start
+        while forward_end > forward_start:
+            if 0 < backward_end - backward_start < forward_end - forward_start:
+                next_end, meeting = self.expand_layer(
+                    arena.backward_queue, backward_start, backward_end,
+                    arena.backward_visited, arena.backward_parents, arena.backward_depths,
+                    arena.visited, arena.depths
+                )
+                backward_start, backward_end = backward_end, next_end
+                if meeting is not None:
+                    target_side, head_side = meeting
+                    break
+            else:
+                next_end, meeting = self.expand_layer(
+                    arena.queue, forward_start, forward_end,
+                    arena.visited, arena.parents, arena.depths,
+                    arena.backward_visited, arena.backward_depths
+                )
+                forward_start, forward_end = forward_end, next_end
+                if meeting is not None:
+                    head_side, target_side = meeting
+                    break
+                if forward_end > forward_start:
+                    farthest = arena.queue[forward_start]
+        else:
+            # No target is reachable, the head side has been flooded
+            self.longest_path = self.trace_path(farthest)
+            return
+
+        self.path = self.trace_path(head_side) + self.trace_chain(target_side, arena.backward_parents)
+
+SEARCHERS: dict[str, type[BFS]] = {
+    "bfs": BFS,
+    "astar": AStar,
+    "bidirectional": BidirectionalBFS
+}
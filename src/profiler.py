@@ -0,0 +1,182 @@
+import csv
+import json
+import random
+import sys
+import time
+import numpy as np
+from collections import deque
+
+# Percentiles reported for every span and counter
+PERCENTILES: tuple[int, ...] = (50, 95, 99)
+# Samples kept per name: a uniform reservoir for percentiles and the newest ones for `last`
+RESERVOIR_SIZE: int = 4096
+RECENT_SIZE: int = 1024
+
+class Samples:
+    """
+    Bounded record of one name's samples.
+
+    `count`, `total` and `max` are exact. Percentiles come from a reservoir
+    of at most `RESERVOIR_SIZE` samples picked uniformly (Algorithm R), and
+    `recent` holds the newest `RECENT_SIZE`, so memory stays constant
+    however long a game runs.
+    """
+    __slots__ = ("count", "total", "max", "reservoir", "recent", "rng")
+
+    def __init__(self):
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = float("-inf")
+        self.reservoir: list[float] = []
+        self.recent: deque[float] = deque(maxlen=RECENT_SIZE)
+        # Own generator, so sampling never shifts the game's random stream
+        self.rng: random.Random = random.Random(0)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+        if len(self.reservoir) < RESERVOIR_SIZE:
+            self.reservoir.append(value)
+        else:
+            slot: int = self.rng.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.reservoir[slot] = value
+
+class Span:
+    """Context manager timing one block of code under `name`."""
+    __slots__ = ("profiler", "name", "start", "blocks")
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler: Profiler = profiler
+        self.name: str = name
+
+    def __enter__(self) -> 'Span':
+        self.blocks: int = sys.getallocatedblocks()
+        self.start: float = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed: float = time.perf_counter() - self.start
+        self.profiler.record(self.name, elapsed, sys.getallocatedblocks() - self.blocks)
+
+class NullSpan:
+    """Shared do-nothing span handed out while profiling is off."""
+    __slots__ = ()
+
+    def __enter__(self) -> 'NullSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+NULL_SPAN: NullSpan = NullSpan()
+
+class Profiler:
+    """
+    Named timing spans and counters, off unless `enabled`.
+
+    `span(name)` times a `with` block. It keeps the duration and the net
+    change in allocated memory blocks (`sys.getallocatedblocks`).
+    `count(name, value)` keeps a sample such as nodes expanded per search.
+    Every call adds one sample, so a span inside the game loop becomes a
+    per-frame histogram. `summary()` reports p50/p95/p99 for each name.
+    Samples are kept in a bounded `Samples` per name.
+
+    While disabled, `span` returns one shared no-op object and `count`
+    returns at once, so instrumented code costs one attribute check.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled: bool = enabled
+        self.timings: dict[str, Samples] = {}
+        self.allocations: dict[str, int] = {}
+        self.counters: dict[str, Samples] = {}
+
+    def span(self, name: str) -> Span | NullSpan:
+        return Span(self, name) if self.enabled else NULL_SPAN
+
+    def record(self, name: str, seconds: float, allocations: int = 0) -> None:
+        samples: Samples = self.timings.get(name)
+        if samples is None:
+            samples = self.timings[name] = Samples()
+        samples.add(seconds)
+        self.allocations[name] = self.allocations.get(name, 0) + allocations
+
+    def count(self, name: str, value: int) -> None:
+        if self.enabled:
+            samples: Samples = self.counters.get(name)
+            if samples is None:
+                samples = self.counters[name] = Samples()
+            samples.add(value)
+
+    def reset(self) -> None:
+        self.timings.clear()
+        self.allocations.clear()
+        self.counters.clear()
+
+    def summary(self, last: int = None, names: list[str] = None) -> dict[str, dict[str, float]]:
+        """
+        Statistics per name (all names unless `names` is given): `samples`,
+        `total`, `mean`, `max` and the `PERCENTILES`. Times are in
+        milliseconds. Spans also have `allocations`, the net count over all
+        samples. `last` only looks at the newest samples, up to `RECENT_SIZE`.
+        Without it percentiles come from the reservoir, the rest is exact.
+        """
+        stats: dict[str, dict[str, float]] = {}
+        sources: list[tuple[dict[str, Samples], str, float]] = [(self.timings, "ms", 1000.0), (self.counters, "count", 1.0)]
+        for samples_by_name, unit, scale in sources:
+            for name in names if names is not None else samples_by_name:
+                samples: Samples = samples_by_name.get(name)
+                if samples is None:
+                    continue
+                if last:
+                    values: np.ndarray = np.array(samples.recent, dtype=np.float64)[-last:] * scale
+                    count: int = len(values)
+                    total: float = float(values.sum())
+                    maximum: float = float(values.max())
+                else:
+                    values = np.array(samples.reservoir, dtype=np.float64) * scale
+                    count = samples.count
+                    total = samples.total * scale
+                    maximum = samples.max * scale
+                entry: dict[str, float] = {
+                    "unit": unit,
+                    "samples": count,
+                    "total": total,
+                    "mean": total / count,
+                    "max": maximum
+                }
+                for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES).tolist()):
+                    entry[f"p{percentile}"] = value
+                if samples_by_name is self.timings:
+                    entry["allocations"] = self.allocations[name]
+                stats[name] = entry
+        return stats
+
+    def export(self, path: str) -> None:
+        """Write `summary()` to `path`, as CSV when it ends in `.csv`, otherwise JSON."""
+        stats: dict[str, dict[str, float]] = self.summary()
+        if path.endswith(".csv"):
+            columns: list[str] = ["name", "unit", "samples", "total", "mean", "max"] + [f"p{p}" for p in PERCENTILES] + ["allocations"]
+            with open(path, "w", newline="") as file:
+                writer: csv.DictWriter = csv.DictWriter(file, columns)
+                writer.writeheader()
+                for name, entry in stats.items():
+                    writer.writerow(dict(entry, name=name))
+        else:
+            with open(path, "w") as file:
+                json.dump(stats, file, indent=4)
+
+    def overlay_lines(self, names: list[str], last: int = 120) -> list[str]:
+        """One `name p50/p95/p99` line per name with samples, over the newest `last` samples."""
+        stats: dict[str, dict[str, float]] = self.summary(last, names)
+        return [
+            f"{name:<14} " + " ".join(f"{stats[name][f'p{p}']:7.2f}" for p in PERCENTILES) + f" {stats[name]['unit']}"
+            for name in names if name in stats
+        ]
+
+# One profiler per process. `Simulation.load_config` only ever switches it
+# on, never off, so a config without profiling leaves an earlier opt-in
+# (another simulation or the caller) in place; set `enabled` to turn it off.
+PROFILER: Profiler = Profiler()
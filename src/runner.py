@@ -0,0 +1,68 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from simulation import Simulation
+
+def play_episode(path: str, seed: int, max_ticks: int) -> dict:
+    """Generate a world and play one autopilot episode in this process."""
+    start: float = time.perf_counter()
+    simulation: Simulation = Simulation(path, seed=seed)
+    generation_time: float = time.perf_counter() - start
+
+    simulation.run(max_ticks)
+    return {
+        "seed": seed,
+        "apples_eaten": simulation.apples_eaten,
+        "apples_left": len(simulation.apples),
+        "ticks": simulation.ticks,
+        "exit_reached": simulation.won,
+        "lost": simulation.snake.lost(),
+        "timed_out": not simulation.finished,
+        "planner_time": simulation.planner_time,
+        "generation_time": generation_time,
+        "total_time": time.perf_counter() - start
+    }
+
+def run_episodes(path: str, seeds: list[int], max_ticks: int, output: str, workers: int = None) -> list[dict]:
+    """
+    Play one episode per seed across a process pool.
+
+    Each finished episode is appended to `output` as one JSON line as soon
+    as it completes, so partial results survive an interrupted run. An
+    episode that raises is written as `{"seed", "error"}` and the others
+    keep running.
+    """
+    results: list[dict] = []
+    with open(output, "a") as file, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(play_episode, path, seed, max_ticks): seed for seed in seeds}
+        for future in as_completed(futures):
+            try:
+                result: dict = future.result()
+            except Exception as error:
+                result = {"seed": futures[future], "error": f"{type(error).__name__}: {error}"}
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+            results.append(result)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play seeded headless episodes in parallel.")
+    parser.add_argument("--config", default="./res/config.json")
+    parser.add_argument("--episodes", type=int, default=os.cpu_count())
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="./res/episodes.jsonl")
+    args = parser.parse_args()
+
+    seeds: list[int] = list(range(args.first_seed, args.first_seed + args.episodes))
+    start: float = time.perf_counter()
+    results: list[dict] = run_episodes(args.config, seeds, args.max_ticks, args.output, args.workers)
+    elapsed: float = time.perf_counter() - start
+
+    won: int = sum(result.get("exit_reached", False) for result in results)
+    failed: int = sum("error" in result for result in results)
+    print(f"{len(results)} episodes in {elapsed:.1f} s, {won} reached the exit, {failed} failed, results in {args.output}")
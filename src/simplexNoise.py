@@ -0,0 +1,91 @@
+import numpy as np
+
+# Ken Perlin's permutation, doubled so lookups need no wrap-around. Together
+# with the float32 arithmetic below it reproduces `noise.snoise2` exactly.
+PERM: np.ndarray = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140,
+    36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120,
+    234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57, 177, 33,
+    88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165, 71,
+    134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133,
+    230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161,
+    1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130,
+    116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217, 226, 250,
+    124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
+    47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44,
+    154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98,
+    108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228, 251, 34,
+    242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14,
+    239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121,
+    50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243,
+    141, 128, 195, 78, 66, 215, 61, 156, 180
+] * 2, dtype=np.intp)
+
+GRAD3: np.ndarray = np.array([
+    [1, 1], [-1, 1], [1, -1], [-1, -1],
+    [1, 0], [-1, 0], [1, 0], [-1, 0],
+    [0, 1], [0, -1], [0, 1], [0, -1]
+], dtype=np.float32)
+
+F2: np.float32 = np.float32(0.3660254037844386)  # 0.5 * (sqrt(3.0) - 1.0)
+G2: np.float32 = np.float32(0.21132486540518713)  # (3.0 - sqrt(3.0)) / 6.0
+
+def noise2(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Single octave 2D simplex noise for float32 coordinate arrays."""
+    s: np.ndarray = (x + y) * F2
+    i: np.ndarray = np.floor(x + s)
+    j: np.ndarray = np.floor(y + s)
+    t: np.ndarray = (i + j) * G2
+
+    x0: np.ndarray = x - (i - t)
+    y0: np.ndarray = y - (j - t)
+
+    # Second corner is (1, 0) in the lower triangle, (0, 1) in the upper one
+    lower: np.ndarray = x0 > y0
+    i1: np.ndarray = lower.astype(np.float32)
+    j1: np.ndarray = (~lower).astype(np.float32)
+
+    x1: np.ndarray = x0 - i1 + G2
+    y1: np.ndarray = y0 - j1 + G2
+    x2: np.ndarray = x0 + G2 * np.float32(2.0) - np.float32(1.0)
+    y2: np.ndarray = y0 + G2 * np.float32(2.0) - np.float32(1.0)
+
+    I: np.ndarray = i.astype(np.intp) & 255
+    J: np.ndarray = j.astype(np.intp) & 255
+    lower_step: np.ndarray = lower.astype(np.intp)
+    g0: np.ndarray = PERM[I + PERM[J]] % 12
+    g1: np.ndarray = PERM[I + lower_step + PERM[J + 1 - lower_step]] % 12
+    g2: np.ndarray = PERM[I + 1 + PERM[J + 1]] % 12
+
+    total: np.ndarray = np.zeros_like(x)
+    for xc, yc, g in ((x0, y0, g0), (x1, y1, g1), (x2, y2, g2)):
+        f: np.ndarray = np.float32(0.5) - xc * xc - yc * yc
+        corner: np.ndarray = f * f * f * f * (GRAD3[g, 0] * xc + GRAD3[g, 1] * yc)
+        total = total + np.where(f > 0, corner, np.float32(0.0))
+    return total * np.float32(70.0)
+
+def snoise2(x: np.ndarray, y: np.ndarray, octaves: int = 1, persistence: float = 0.5,
+            lacunarity: float = 2.0, base: float = 0.0) -> np.ndarray:
+    """
+    Array version of `noise.snoise2` (without tiling).
+
+    `x` and `y` are broadcast against each other, so a column of y values
+    and a row of x values give the noise for a whole grid in one call.
+    """
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    x, y = np.broadcast_arrays(x, y)
+    base_offset: np.float32 = np.float32(base)
+    persistence_f: np.float32 = np.float32(persistence)
+    lacunarity_f: np.float32 = np.float32(lacunarity)
+
+    freq: np.float32 = np.float32(1.0)
+    amp: np.float32 = np.float32(1.0)
+    max_amp: np.float32 = np.float32(1.0)
+    total: np.ndarray = noise2(x + base_offset, y + base_offset)
+    for _ in range(1, octaves):
+        freq = freq * lacunarity_f
+        amp = amp * persistence_f
+        max_amp = max_amp + amp
+        total = total + noise2(x * freq + base_offset, y * freq + base_offset) * amp
+    return total / max_amp
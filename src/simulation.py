@@ -0,0 +1,224 @@
+import json
+import random
+import time
+
+from snake import Snake, Apple, AppleRegistry
+from map import Map
+from gridElements import Block, Grid
+from pathSearchers import BFS, AStar, SEARCHERS
+from profiler import PROFILER
+
+class Simulation:
+    """
+    Game rules without rendering.
+
+    Holds the map, snake, apples, exit and path searcher and advances them
+    one tick per `step()`, with no display, fonts or surfaces and no frame
+    limit. With `autopilot` the snake follows the searcher's path, otherwise
+    its direction is left to the caller (keyboard input in `Game`).
+
+    All randomness (maze, map, apples, colours, exit) comes from one
+    `random.Random` seeded with `seed`, or the config's `seed` when not
+    given, so the same seed replays the same episode.
+    """
+    def __init__(self, path: str, autopilot: bool = True, seed: int = None) -> None:
+        self.load_config(path)
+        if seed is not None:
+            self.seed = seed
+        self.rng: random.Random = random.Random(self.seed)
+        self.autopilot: bool = autopilot
+        self.initialize_game_elements(path)
+
+    def load_config(self, path: str) -> None:
+        with open(path, "r") as file:
+            data: dict = json.load(file)
+
+        self.blocks_in_cell: int = data["blocks_in_cell"]
+        self.map_width: int = data["maze_width_in_cells"] * self.blocks_in_cell
+        self.map_height: int = data["maze_height_in_cells"] * self.blocks_in_cell
+
+        self.apple_count: int = data["apple_count"]
+        self.path_searcher_name: str = data.get("path_searcher", "bfs")
+        self.seed: int = data.get("seed")
+        self.world_cache: str = data.get("world_cache")
+
+        profiling: dict = data.get("profiling", {})
+        # Only ever switched on here, a profiler enabled by the caller stays on
+        if profiling.get("enabled"):
+            PROFILER.enabled = True
+        self.profile_output: str = profiling.get("output")
+
+    def initialize_game_elements(self, path: str) -> None:
+        if self.world_cache and self.seed is not None:
+            maps_obj: Map = Map.cached(path, self.world_cache, self.seed, self.rng)
+        else:
+            maps_obj: Map = Map(path, rng=self.rng)
+        self.map: Grid = maps_obj.map
+        start_location: tuple[int, int] = self.find_snake_location()
+        if not start_location:
+            raise RuntimeError("No location to start, please re-start! :)")
+        self.snake: Snake = Snake(path, start_location, self.rng)
+        self.path_searcher: BFS = self.create_path_searcher()
+        self.apples: AppleRegistry = AppleRegistry()
+        self.generate_apples(self.apple_count, start_location)
+        self.exit_blocks: set[Block] = set()
+        if not self.apples:
+            self.create_exit()
+
+        self.ticks: int = 0
+        self.apples_eaten: int = 0
+        self.planner_time: float = 0.0
+        self.won: bool = False
+        self.finished: bool = False
+        self.plan_path()
+
+    def create_path_searcher(self) -> BFS:
+        searcher: type[BFS] = SEARCHERS[self.path_searcher_name]
+        if issubclass(searcher, AStar):
+            return searcher(self.map, river_weight=self.snake.speed_in_river)
+        return searcher(self.map)
+
+    def find_snake_location(self) -> tuple[int, int]:
+        for x in range(self.map_width // 4, 3 * self.map_width // 4):
+            for y in range(self.map_height // 4, 3 * self.map_height // 4):
+                if not self.map[y][x].get_walls() and not self.map[y][x].get_traits() and not self.neighbours_has_traits(x, y):
+                    return (x, y)
+        return None
+
+    def generate_apples(self, apple_count: int, snake_start: tuple[int, int]) -> None:
+        for _ in range(apple_count):
+            x: int
+            y: int
+            x, y = self.find_apple_location()
+            while (x, y) == snake_start or (x, y) in self.apples or self.other_apples_nearby(x, y, 5):
+                x, y = self.find_apple_location()
+            self.apples.add(Apple((x, y), self.rng))
+
+    def other_apples_nearby(self, x: int, y: int, distance: int) -> bool:
+        return self.apples.any_within(x, y, distance)
+
+    def find_apple_location(self) -> tuple[int, int]:
+        for _ in range(100):
+            x: int = self.rng.randint(0, self.map_width - 1)
+            y: int = self.rng.randint(0, self.map_height - 1)
+            if not self.map[y][x].get_walls() and not self.map[y][x].get_traits() and not self.neighbours_has_traits(x, y):
+                return (x, y)
+        return None
+
+    def create_exit(self) -> None:
+        border_length: int = 2 * (self.map_width + self.map_height) - 4
+        position: int = self.rng.randint(0, border_length - 1)
+        # Walk the border clockwise from the top left corner; `vertical`
+        # exits lie on the left or right edge and run downwards
+        x: int
+        y: int
+        vertical: bool
+        if position < self.map_width:
+            x, y, vertical = position, 0, False
+        elif position < self.map_width + self.map_height - 1:
+            x, y, vertical = self.map_width - 1, position - self.map_width + 1, True
+        elif position < 2 * self.map_width + self.map_height - 2:
+            x, y, vertical = 2 * self.map_width + self.map_height - 3 - position, self.map_height - 1, False
+        else:
+            x, y, vertical = 0, border_length - position - 1, True
+
+        # Only the coordinate along the edge moves, so the exit ends inside the map
+        if vertical:
+            y = min(y, self.map_height - self.blocks_in_cell)
+        else:
+            x = min(x, self.map_width - self.blocks_in_cell)
+
+        for l in range(0, self.blocks_in_cell):
+            block: Block = self.map[y + l][x] if vertical else self.map[y][x + l]
+            block.walls = {"top": False, "down": False, "left": False, "right": False}
+            self.exit_blocks.add(block)
+        self.path_searcher.update_walls((block.x, block.y) for block in self.exit_blocks)
+
+    def neighbours_has_traits(self, x: int, y: int) -> bool:
+        directions: list[list[int]] = [
+            [-1, -1], [0, -1], [1, -1],
+            [-1, 0],          [1, 0],
+            [-1, 1], [0, 1], [1, 1],
+        ]
+
+        neighbours_has_traits: bool = False
+        for dx, dy in directions:
+            nx: int = min(max(0, x + dx), self.map_width - 1)
+            ny: int = min(max(0, y + dy), self.map_height - 1)
+
+            if self.map[ny][nx].get_traits() is not None:
+                neighbours_has_traits = True
+                break
+
+        return neighbours_has_traits
+
+    def plan_path(self) -> None:
+        start: float = time.perf_counter()
+        if self.apples:
+            self.path_searcher.update_path(self.snake, self.apples)
+        else:
+            self.path_searcher.update_path(self.snake, self.exit_blocks)
+        self.planner_time += time.perf_counter() - start
+
+    def steer(self) -> None:
+        """Point the snake at the next block of the planned path."""
+        head_x: int = self.snake.body[0].x
+        head_y: int = self.snake.body[0].y
+        path: list[tuple[int, int]] = self.path_searcher.path or self.path_searcher.longest_path
+        if len(path) > 1:
+            self.snake.direction = (path[1][0] - head_x, path[1][1] - head_y)
+        elif self.map[head_y][head_x] in self.exit_blocks:
+            # Standing in the exit, step out over the map border
+            if head_x == 0:
+                self.snake.direction = (-1, 0)
+            elif head_x == self.map_width - 1:
+                self.snake.direction = (1, 0)
+            elif head_y == 0:
+                self.snake.direction = (0, -1)
+            else:
+                self.snake.direction = (0, 1)
+        else:
+            self.snake.direction = (0, 0)
+
+    def step(self) -> bool:
+        """Advance one tick. Returns False once the episode is over."""
+        if self.finished:
+            return False
+        if self.autopilot:
+            self.steer()
+
+        snake_block: Block = self.map[self.snake.body[0].y][self.snake.body[0].x]
+        next_block: Block = None
+        if (0 <= self.snake.body[0].y + self.snake.direction[1] < self.map_height) \
+        and (0 <= self.snake.body[0].x + self.snake.direction[0] < self.map_width):
+            next_block = self.map[self.snake.body[0].y + self.snake.direction[1]][self.snake.body[0].x + self.snake.direction[0]]
+
+        if not next_block and snake_block in self.exit_blocks:
+            self.finished = True
+            self.won = True
+            return False
+
+        self.snake.check_snake_collision(snake_block, next_block)
+        self.snake.move()
+
+        if self.snake.check_apples_collision(self.apples):
+            self.apples_eaten += 1
+            if not self.apples:
+                self.create_exit()
+        self.plan_path()
+        if self.snake.lost():
+            self.finished = True
+
+        self.ticks += 1
+        return not self.finished
+
+    def run(self, max_ticks: int) -> bool:
+        """Step until the episode ends or `max_ticks` pass. Returns `won`."""
+        while self.ticks < max_ticks and self.step():
+            pass
+        return self.won
+
+    def export_profile(self) -> None:
+        """Write the profile to the configured `output`, when profiling is on."""
+        if PROFILER.enabled and self.profile_output:
+            PROFILER.export(self.profile_output)
@@ -1,6 +1,9 @@
 import pygame
 import random
 import json
+from collections import deque
+from collections.abc import Iterator
+from itertools import islice
 from gridElements import Block
 
 WIDTH: int = 600
@@ -9,23 +12,27 @@ GRID_SIZE: int = 20  # Size of each block (both snake body and apple)
 ROWS: int = WIDTH // GRID_SIZE
 COLS: int = HEIGHT // GRID_SIZE  # Grid dimensions
 
+# How many vacated positions a snake remembers for the planner
+VACATED_HISTORY: int = 64
+
 WHITE: tuple[int, int, int] = (255, 255, 255)
 BLACK: tuple[int, int, int] = (0, 0, 0)
 
 class Apple:
-    def __init__(self, coord: tuple[int, int]):
+    def __init__(self, coord: tuple[int, int], rng: random.Random = None):
         self.x: int
         self.y: int
         self.x, self.y = coord
+        self.rng: random.Random = rng if rng else random.Random()
         self.color: tuple[int, int, int] = self._generate_random_color()
 
     def reposition(self) -> None:
-        self.x = random.randint(0, COLS - 1)
-        self.y = random.randint(0, ROWS - 1)
+        self.x = self.rng.randint(0, COLS - 1)
+        self.y = self.rng.randint(0, ROWS - 1)
         self.color = self._generate_random_color()
 
     def _generate_random_color(self) -> tuple[int, int, int]:
-        return (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+        return (self.rng.randint(0, 255), self.rng.randint(0, 255), self.rng.randint(0, 255))
     
     def __repr__(self) -> str:
         return f"Apple(x={self.x}, y={self.y}, color={self.color})"
@@ -35,6 +42,59 @@ class Apple:
             return self.x == other.x and self.y == other.y
         return False
     
+class AppleRegistry:
+    """
+    Apples keyed by position, with a coarse grid of buckets for area queries.
+
+    Replaces a plain apple list: it iterates in insertion order and has a
+    length, but finds the apple on a block in O(1) and only looks at the
+    buckets an area overlaps.
+    """
+    def __init__(self, bucket_size: int = 8):
+        self.bucket_size: int = bucket_size
+        self.by_position: dict[tuple[int, int], Apple] = {}
+        self.buckets: dict[tuple[int, int], set[tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_position)
+
+    def __iter__(self) -> Iterator[Apple]:
+        return iter(self.by_position.values())
+
+    def __contains__(self, position: tuple[int, int]) -> bool:
+        return position in self.by_position
+
+    def add(self, apple: Apple) -> None:
+        position: tuple[int, int] = (apple.x, apple.y)
+        self.by_position[position] = apple
+        self.buckets.setdefault((apple.x // self.bucket_size, apple.y // self.bucket_size), set()).add(position)
+
+    def at(self, x: int, y: int) -> Apple:
+        return self.by_position.get((x, y))
+
+    def pop_at(self, x: int, y: int) -> Apple:
+        """Remove and return the apple on (x, y), `None` when there is none."""
+        apple: Apple = self.by_position.pop((x, y), None)
+        if apple is not None:
+            key: tuple[int, int] = (x // self.bucket_size, y // self.bucket_size)
+            self.buckets[key].discard((x, y))
+            if not self.buckets[key]:
+                del self.buckets[key]
+        return apple
+
+    def in_area(self, left: int, top: int, right: int, bottom: int) -> Iterator[Apple]:
+        """Apples with `left <= x <= right` and `top <= y <= bottom`."""
+        size: int = self.bucket_size
+        for by in range(top // size, bottom // size + 1):
+            for bx in range(left // size, right // size + 1):
+                for x, y in self.buckets.get((bx, by), ()):
+                    if left <= x <= right and top <= y <= bottom:
+                        yield self.by_position[(x, y)]
+
+    def any_within(self, x: int, y: int, distance: int) -> bool:
+        """Whether an apple lies at most `distance` blocks away on both axes."""
+        return next(self.in_area(x - distance, y - distance, x + distance, y + distance), None) is not None
+
 class SnakeBodyBlock:
     def __init__(self, coord: tuple[int, int]):
         self.x: int
@@ -45,15 +105,34 @@ class SnakeBodyBlock:
         return f"Block(x={self.x}, y={self.y})"
 
 class Snake:
-    def __init__(self, path: str, initial_position: tuple[int, int]):
+    """
+    Snake body as a deque of blocks, head first, with an occupancy grid.
+
+    `occupancy` counts the body blocks on every map block, indexed by
+    `y * map_width + x`, and is updated as blocks are pushed and popped, so
+    self collisions and planners read it without scanning the body. Blocks
+    whose count drops to zero are logged in `vacated` (see `vacated_since`).
+    """
+    def __init__(self, path: str, initial_position: tuple[int, int], rng: random.Random = None, map_size: tuple[int, int] = None):
         with open(path, "r") as file:
             data: dict = json.load(file)
 
-        blocks_in_cell: int = data["blocks_in_cell"]
-        self.map_width: int = data["maze_width_in_cells"] * blocks_in_cell
-        self.map_height: int = data["maze_height_in_cells"] * blocks_in_cell
+        self.rng: random.Random = rng if rng else random.Random(data.get("seed"))
 
-        self.body: list[SnakeBodyBlock] = [SnakeBodyBlock(initial_position)]
+        blocks_in_cell: int = data["blocks_in_cell"]
+        self.map_width: int
+        self.map_height: int
+        # `map_size` (in blocks) overrides the config
+        self.map_width, self.map_height = map_size if map_size else (
+            data["maze_width_in_cells"] * blocks_in_cell,
+            data["maze_height_in_cells"] * blocks_in_cell
+        )
+
+        self.occupancy: list[int] = [0] * (self.map_width * self.map_height)
+        self.vacated: deque[tuple[int, int]] = deque(maxlen=VACATED_HISTORY)
+        self.vacated_total: int = 0
+        self.body: deque[SnakeBodyBlock] = deque()
+        self.add_tail(SnakeBodyBlock(initial_position))
         self.body_colors: list[tuple[int, int, int]] = [self._generate_random_color()]
         self.direction: tuple[int, int] = (0, 0)
         
@@ -67,6 +146,38 @@ class Snake:
         self.skip_next_move: bool = False
         self.not_moving_counter: int = 0
 
+    def occupy(self, block: SnakeBodyBlock) -> None:
+        if 0 <= block.x < self.map_width and 0 <= block.y < self.map_height:
+            self.occupancy[block.y * self.map_width + block.x] += 1
+
+    def release(self, block: SnakeBodyBlock) -> None:
+        if 0 <= block.x < self.map_width and 0 <= block.y < self.map_height:
+            index: int = block.y * self.map_width + block.x
+            self.occupancy[index] -= 1
+            if not self.occupancy[index]:
+                self.vacated.append((block.x, block.y))
+                self.vacated_total += 1
+
+    def add_tail(self, block: SnakeBodyBlock) -> None:
+        self.body.append(block)
+        self.occupy(block)
+
+    def occupied(self, x: int, y: int) -> int:
+        """Number of body blocks on (x, y)."""
+        if 0 <= x < self.map_width and 0 <= y < self.map_height:
+            return self.occupancy[y * self.map_width + x]
+        return 0
+
+    def vacated_since(self, total: int) -> list[tuple[int, int]]:
+        """
+        Positions vacated after the first `total` ones (a past `vacated_total`),
+        or `None` when they are no longer all remembered.
+        """
+        new: int = self.vacated_total - total
+        if new < 0 or new > len(self.vacated):
+            return None
+        return list(islice(self.vacated, len(self.vacated) - new, None))
+
     def move(self) -> None:
         if self.tp_next_move:
             self.teleport_move()
@@ -84,14 +195,15 @@ class Snake:
         new_x: int = head.x + self.direction[0] 
         new_y: int = head.y + self.direction[1] 
         new_head: SnakeBodyBlock = SnakeBodyBlock((new_x, new_y))
-        self.body.insert(0, new_head)
-        self.body.pop()
+        self.body.appendleft(new_head)
+        self.occupy(new_head)
+        self.release(self.body.pop())
 
         self.not_moving_counter = 0
 
     def grow(self, apple: Apple) -> None:
         last_block: SnakeBodyBlock = self.body[-1]
-        self.body.append(SnakeBodyBlock((last_block.x, last_block.y)))
+        self.add_tail(SnakeBodyBlock((last_block.x, last_block.y)))
         self.body_colors.append(apple.color)
 
     def change_direction(self, new_direction: tuple[int, int]) -> None:
@@ -109,24 +221,24 @@ class Snake:
             self.grow(apple)
             apple.reposition()
 
-    def check_apples_collision(self, apples: list[Apple]) -> bool:
+    def check_apples_collision(self, apples: AppleRegistry) -> bool:
         head: SnakeBodyBlock = self.body[0]
-        for i in range(len(apples)):
-            apple = apples[i]
-            if int(head.x) == apple.x and int(head.y) == apple.y:
-                self.grow(apple)
-                apples.pop(i)
-                return True
-        return False
+        apple: Apple = apples.pop_at(int(head.x), int(head.y))
+        if apple is None:
+            return False
+        self.grow(apple)
+        return True
 
     def check_snake_collision(self, snake_block: Block, next_step_block: Block) -> None:
         head: SnakeBodyBlock = self.body[0]
-        for i in range(1, len(self.body)):
-           if self.body[i].x == head.x + self.direction[0] and \
-            self.body[i].y == head.y + self.direction[1]:
-                self.skip_next_move = True
-                return
-           
+        # Body blocks on the next block, not counting the head itself
+        body_ahead: int = self.occupied(head.x + self.direction[0], head.y + self.direction[1])
+        if self.direction == (0, 0):
+            body_ahead -= 1
+        if body_ahead > 0:
+            self.skip_next_move = True
+            return
+
         if self.direction == (0, 0) or self.ghost_mode:
             return
         if not next_step_block:
@@ -175,12 +287,15 @@ class Snake:
         tx: int = head.x + 2 * self.direction[0]
         ty: int = head.y + 2 * self.direction[1]
 
+        for block in self.body:
+            self.release(block)
         if self.can_teleport_to_new_location(tx, ty):
             head.x = tx
             head.y = ty
-        for i in range(1, len(self.body)):
-            self.body[i].x = head.x
-            self.body[i].y = head.y
+        for block in self.body:
+            block.x = head.x
+            block.y = head.y
+            self.occupy(block)
 
         self.not_moving_counter = 0
     
@@ -205,7 +320,7 @@ class Snake:
                 self.ghost_mode = not self.ghost_mode
     
     def _generate_random_color(self) -> tuple[int, int, int]:
-        return (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+        return (self.rng.randint(0, 255), self.rng.randint(0, 255), self.rng.randint(0, 255))
 
     def __repr__(self) -> str:
         return f"Snake(body={self.body})"
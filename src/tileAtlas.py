@@ -0,0 +1,96 @@
+import numpy as np
+import pygame
+from gridElements import WALL_BITS, TRAIT_BITS
+
+# Heights are drawn in this many shades of the terrain colour
+HEIGHT_LEVELS: int = 64
+
+class TileAtlas:
+    """
+    Pre-rendered block surfaces, so drawing a region is one `Surface.blits()`
+    call per layer instead of several draw calls per block.
+
+    Ground surfaces exist for every quantized height and every trait colour,
+    wall surfaces for every `WALL_BITS` mask. `border` leaves a frame of the
+    path colour around height shades (traits always fill the block), and
+    `walls_inside` draws the right and bottom walls on the block's last
+    pixel instead of the first pixel of the next block.
+
+    The atlas is built for one `block_size`; make a new one when it changes.
+    """
+    def __init__(self, block_size: int, colors: dict, tree_size: float = 1.0, border: int = 0, walls_inside: bool = False):
+        self.block_size: int = block_size
+        self.tree_size: float = tree_size
+        # Trait drawn for a block: the last of its traits in `TRAIT_BITS` order
+        self.traits: list[str] = list(TRAIT_BITS)
+
+        self.ground: list[pygame.Surface] = []
+        terrain: tuple = colors["terrain"]
+        for level in range(HEIGHT_LEVELS):
+            surface: pygame.Surface = pygame.Surface((block_size, block_size))
+            surface.fill(pygame.Color(colors["maze_path"]))
+            height: float = level / (HEIGHT_LEVELS - 1)
+            surface.fill(tuple(c * height for c in terrain), (border, border, block_size - 2 * border, block_size - 2 * border))
+            self.ground.append(surface)
+        for trait in self.traits:
+            surface = pygame.Surface((block_size, block_size))
+            surface.fill(colors[trait])
+            self.ground.append(surface)
+
+        # One pixel larger, lines on the far edges belong to the next block
+        end: int = block_size - 1 if walls_inside else block_size
+        wall_color: pygame.Color = pygame.Color(colors["maze_walls"])
+        self.walls: list[pygame.Surface] = []
+        for mask in range(max(WALL_BITS.values()) * 2):
+            surface = pygame.Surface((block_size + 1, block_size + 1), pygame.SRCALPHA)
+            if mask & WALL_BITS["top"]:
+                pygame.draw.line(surface, wall_color, (0, 0), (end, 0), 1)
+            if mask & WALL_BITS["down"]:
+                pygame.draw.line(surface, wall_color, (0, end), (end, end), 1)
+            if mask & WALL_BITS["left"]:
+                pygame.draw.line(surface, wall_color, (0, 0), (0, end), 1)
+            if mask & WALL_BITS["right"]:
+                pygame.draw.line(surface, wall_color, (end, 0), (end, end), 1)
+            self.walls.append(surface)
+
+        crown_size: int = round(block_size * tree_size)
+        self.crown_offset: float = 0.5 * (1 - tree_size) * block_size
+        self.crown: pygame.Surface = pygame.Surface((crown_size, crown_size), pygame.SRCALPHA)
+        pygame.draw.ellipse(self.crown, colors["tree_crown"], (0, 0, crown_size, crown_size))
+        self.tree_base: pygame.Surface = pygame.Surface((block_size - 2, block_size - 2))
+        self.tree_base.fill(colors["forest"])
+
+    def ground_keys(self, traits: np.ndarray, heights: np.ndarray) -> np.ndarray:
+        """Index into `ground` for every block of the given trait and height arrays."""
+        keys: np.ndarray = np.clip(np.rint(heights * (HEIGHT_LEVELS - 1)), 0, HEIGHT_LEVELS - 1).astype(np.intp)
+        for index, trait in enumerate(self.traits):
+            keys[(traits & TRAIT_BITS[trait]) != 0] = HEIGHT_LEVELS + index
+        return keys
+
+    def positions(self, shape: tuple[int, int], x: float = 0, y: float = 0) -> tuple[list[float], list[float]]:
+        """Pixel corners of every block of a `shape` region drawn from (x, y), in row-major order."""
+        rows, columns = np.indices(shape)
+        return (
+            (columns.ravel() * self.block_size + x).tolist(),
+            (rows.ravel() * self.block_size + y).tolist()
+        )
+
+    def draw_ground(self, surface: pygame.Surface, traits: np.ndarray, heights: np.ndarray, x: float = 0, y: float = 0) -> None:
+        xs, ys = self.positions(traits.shape, x, y)
+        ground: list[pygame.Surface] = self.ground
+        keys: list[int] = self.ground_keys(traits, heights).ravel().tolist()
+        surface.blits([(ground[key], (bx, by)) for key, bx, by in zip(keys, xs, ys)], doreturn=False)
+
+    def draw_walls(self, surface: pygame.Surface, walls: np.ndarray, x: float = 0, y: float = 0) -> None:
+        xs, ys = self.positions(walls.shape, x, y)
+        sprites: list[pygame.Surface] = self.walls
+        surface.blits([(sprites[mask], (bx, by)) for mask, bx, by in zip(walls.ravel().tolist(), xs, ys) if mask], doreturn=False)
+
+    def draw_trees(self, surface: pygame.Surface, traits: np.ndarray, x: float = 0, y: float = 0) -> None:
+        """Crowns of all forest blocks, then their bases on top."""
+        rows, columns = np.nonzero(traits & TRAIT_BITS["forest"])
+        xs: list[float] = (columns * self.block_size + x).tolist()
+        ys: list[float] = (rows * self.block_size + y).tolist()
+        offset: float = self.crown_offset
+        surface.blits([(self.crown, (bx + offset, by + offset)) for bx, by in zip(xs, ys)], doreturn=False)
+        surface.blits([(self.tree_base, (bx + 1, by + 1)) for bx, by in zip(xs, ys)], doreturn=False)